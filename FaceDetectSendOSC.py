@@ -1,59 +1,215 @@
-import numpy as np
-import cv2
 import argparse
+import time
 
 from pythonosc import osc_message_builder
 from pythonosc import udp_client
 
-#https://github.com/Itseez/opencv/blob/master/data/haarcascades/haarcascade_frontalface_default.xml
-face_cascade = cv2.CascadeClassifier('haarcascade_frontalface_default.xml')
-
-FaceisDetected = 0
-FacePositionX = 0
-countImg = 0
-
-cap = cv2.VideoCapture(0)
-while 1:
-    FaceisDetected = 0
-    if __name__ == "__main__":
-      parser = argparse.ArgumentParser()
-      parser.add_argument("--ip", default="localhost", #change IP address here 改你的IP地址
-          help="The ip of the OSC server")
-      parser.add_argument("--port", type=int, default=5005, #change your port here 改你的端口
-          help="The port the OSC server is listening on")
-      args = parser.parse_args()
-
-      client = udp_client.SimpleUDPClient(args.ip, args.port)
-
-    ret, img = cap.read() # capture camera image signal 读取摄像头信号
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-    for (x,y,w,h) in faces:
-        FaceisDetected = 1
-        countImg = countImg + 1
-        #cv2.rectangle(img,(x,y),(x+w,y+h),(255,0,0),2)
-        roi_gray = gray[y:y+h, x:x+w]
-        roi_color = img[y:y+h, x:x+w]
-
-        FacePositionX = x
-        print(FacePositionX)
-        #for (ex,ey,ew,eh) in eyes:
-    #cv2.rectangle(roi_color,(ex,ey),(ex+ew,ey+eh),(0,255,0),2)  ##This will draw a rectangle when face is detected. 在识别到的人脸上面画一个矩形。
-    #cv2.imwrite('Photo_' + str(countImg) + '.png',img)  ##This will save an array of the face images. 保存为识别到的人脸图片序列
-    cv2.imwrite('1.png',img)
-    cv2.imshow('img',img)
-
-    client.send_message("/FaceisDetected", int(FaceisDetected)) ## Send osc message 把脸部检测的信号发送给TD
-    client.send_message("/FPosX", int(FacePositionX)) ## Send osc message 把脸部的位置信号发送给TD
-
-    ## Must be an int/float, the variable FacePositionX is not an int. 同时要注意把数值转化为整数型
-    #time.sleep(0.1)
-    print(args)
-
-    k = cv2.waitKey(30) & 0xff
-    if k == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+from facedetect import FacePipeline, CameraProcesses, GracefulShutdown, OSCSender
+
+#Detect faces on a camera and send them to TouchDesigner over OSC
+#用摄像头识别人脸，通过OSC发送给TouchDesigner
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", nargs="+", default=["0"], #camera index, video file, image folder or synthetic, several for multiple cameras 摄像头编号、视频文件、图片文件夹或synthetic，可填写多个
+        help="Camera index, video file, directory of images or 'synthetic' for generated test frames; "
+             "several sources run in one process each with the same options and send as /cam/<n>/...")
+    parser.add_argument("--replay", choices=("fast", "native"), default="fast",
+        help="For files, image directories and synthetic frames: process every frame as fast as possible "
+             "or at the native frame rate of the source")
+    parser.add_argument("--ip", default="localhost", #change IP address here 改你的IP地址
+        help="The ip of the OSC server")
+    parser.add_argument("--port", type=int, default=5005, #change your port here 改你的端口
+        help="The port the OSC server is listening on")
+    parser.add_argument("--detector", choices=("haar", "lbp", "dnn"), default="haar", #face detection method 人脸检测方法
+        help="haar: Haar cascade, lbp: LBP cascade, faster and less accurate, "
+             "dnn: OpenCV res10 SSD face network on the CPU, slower and more robust to pose and lighting")
+    parser.add_argument("--model",
+        help="Cascade xml file or network weights, the default file of --detector in the working directory if omitted")
+    parser.add_argument("--config",
+        help="Network description file of --detector dnn, deploy.prototxt if omitted")
+    parser.add_argument("--confidence", type=float, default=0.5,
+        help="Smallest confidence in [0, 1] of a face found by --detector dnn")
+    parser.add_argument("--min-neighbors", type=int, default=5, #lower is faster, combine with --min-score 越小越快，可配合--min-score使用
+        help="minNeighbors of the cascades, lower values are faster and find more false faces, "
+             "which --min-score filters out")
+    parser.add_argument("--min-score", type=float, #smallest confidence of a face 人脸的最低置信度
+        help="Drop cascade faces whose level weight, the confidence reported by detectMultiScale3, is below this value")
+    parser.add_argument("--detect-scale", type=float, default=1.0, #detect on a smaller copy of the frame 在缩小的图像上检测人脸
+        help="Resize factor in (0, 1] applied before face detection, 0.5 is about 4x faster on 1080p")
+    parser.add_argument("--detect-interval", type=int, default=1, #run the cascade every N frames 每N帧检测一次人脸
+        help="Run the cascade every N frames and track the faces in between, 1 detects on every frame")
+    parser.add_argument("--track-threshold", type=float, default=0.6,
+        help="Tracking score in [-1, 1] below which the cascade runs again")
+    parser.add_argument("--roi-padding", type=float, default=0, #search only around the last faces 只在上一帧人脸附近搜索
+        help="Search only windows padded by this fraction of the face size around the last faces, 0 scans the whole frame")
+    parser.add_argument("--full-scan-interval", type=int, default=30,
+        help="Scan the whole frame at least every N detections when --roi-padding is set")
+    parser.add_argument("--tiles", action="store_true", #detect high resolution frames in tiles on several threads 高分辨率画面分块多线程检测
+        help="Detect in overlapping tiles on a thread pool, for 4K frames with small faces; tile size and overlap "
+             "follow --min-face; needs a cascade --detector, not combinable with --detect-scale, --latency-budget "
+             "and --workers")
+    parser.add_argument("--min-face", type=int, default=40,
+        help="Smallest face in source pixels searched by --tiles")
+    parser.add_argument("--motion-gate", type=float, default=0, #skip detection while the scene is static 画面静止时跳过检测
+        help="Skip detection and reuse the last faces while less than this fraction of a 64 pixel wide thumbnail "
+             "changed since the last detection, e.g. 0.002; 0 detects on every frame")
+    parser.add_argument("--foreground", action="store_true", #search only around moving people 只在运动的人附近搜索
+        help="Find moving blobs with MOG2 background subtraction on a 160 pixel wide copy of the frame and "
+             "run the detector only inside their padded bounding boxes and around the last faces, "
+             "not combinable with --roi-padding; the background model learns only on frames the detector runs on, "
+             "so with --detect-interval N or --motion-gate it adapts N times slower")
+    parser.add_argument("--workers", type=int, default=1, #detect in several processes 多进程并行检测
+        help="Number of detection processes, more than 1 detects every frame on the whole frame in parallel; "
+             "not combinable with --detect-interval, --roi-padding, --motion-gate, --foreground and --latency-budget")
+    parser.add_argument("--snapshot", default="1.png", #image file for TouchDesigner, empty to disable 保存给TD读取的图片，留空则不保存
+        help="Image file replaced with the camera frame in the background, empty string disables snapshots")
+    parser.add_argument("--snapshot-rate", type=float, default=10.0,
+        help="Maximum snapshots per second, 0 for no limit")
+    parser.add_argument("--snapshot-faces-only", action="store_true",
+        help="Write snapshots only while a face is detected")
+    parser.add_argument("--headless", action="store_true", #no preview window, for servers 不显示预览窗口
+        help="Run without the preview window, stop with Ctrl+C or SIGTERM")
+    parser.add_argument("--luma", action="store_true", #use the Y plane of the camera without color conversion 直接使用摄像头的亮度通道
+        help="With --headless, a cascade --detector and a camera: request raw YUYV frames and detect on their Y plane "
+             "without cvtColor, snapshots are written in grayscale; falls back to BGR frames if the camera does not "
+             "support it or the source is not a camera")
+    parser.add_argument("--fps", type=float, default=0,
+        help="Target frames per second, 0 runs as fast as the camera delivers frames")
+    parser.add_argument("--latency-budget", type=float, default=0, #adjust detection quality to this time per frame 自动调整检测质量以满足每帧耗时
+        help="Processing time budget per frame in ms, detection scale, interval, minSize and scaleFactor "
+             "are tuned to meet it, 0 uses the fixed settings")
+    parser.add_argument("--output", choices=("messages", "bundle", "presence"), default="messages", #osc output format OSC输出格式
+        help="messages sends /FaceisDetected and /FPosX, bundle sends /face/count and x, y, w, h "
+             "of every face as /face/<i> in one OSC bundle per frame, presence sends the debounced "
+             "/face/present state when it changes and every --heartbeat seconds, and /face/enter and "
+             "/face/leave events")
+    parser.add_argument("--enter-time", type=float, default=0.2, #debounce of --output presence 人脸出现的确认时间
+        help="Seconds faces must be seen before --output presence sends /face/enter")
+    parser.add_argument("--leave-time", type=float, default=1.0, #debounce of --output presence 人脸离开的确认时间
+        help="Seconds faces must be missing before --output presence sends /face/leave with the presence duration")
+    parser.add_argument("--normalize", action="store_true",
+        help="Send bundle coordinates as floats in range [0, 1] of the frame size")
+    parser.add_argument("--scores", action="store_true", #send the confidence of every face 发送每张人脸的置信度
+        help="With --output bundle or --track-ids: also send the detector confidence of every face as /face/<i>/score")
+    parser.add_argument("--track-ids", action="store_true", #keep a stable id for every face 为每张人脸保持固定编号
+        help="Give every face a stable id and send /face/ids and /face/<id>/x, y, w, h")
+    parser.add_argument("--max-distance", type=float, default=1.0,
+        help="Largest face movement between frames, in face widths, that keeps its id")
+    parser.add_argument("--smooth", action="store_true", #smooth the coordinates 平滑人脸坐标
+        help="Filter x, y, w, h of every face with a One Euro filter before sending")
+    parser.add_argument("--min-cutoff", type=float, default=1.0,
+        help="One Euro cutoff frequency in Hz at rest, lower removes more jitter")
+    parser.add_argument("--beta", type=float, default=0.01,
+        help="One Euro cutoff increase with speed, higher reduces lag on fast movements")
+    parser.add_argument("--d-cutoff", type=float, default=1.0,
+        help="One Euro cutoff frequency in Hz of the speed estimate")
+    parser.add_argument("--delta", action="store_true", #send only changed values 只发送变化的数值
+        help="Send a value only when it changed, plus the full state every --heartbeat seconds")
+    parser.add_argument("--delta-threshold", type=float, default=0,
+        help="Face coordinates must change by more than this to be sent again in --delta mode")
+    parser.add_argument("--heartbeat", type=float, default=1.0,
+        help="Seconds between full-state sends in --delta mode and repeats of /face/present with --output "
+             "presence, so receivers recover from lost packets")
+    parser.add_argument("--stats", type=float, default=0, #print timing of every stage 定期显示各阶段耗时
+        help="Print p50/p95/p99 time of every stage and the frame rate every N seconds, 0 disables it")
+    parser.add_argument("--stats-file",
+        help="Append the --stats reports as JSON lines to this file instead of printing them")
+    args = parser.parse_args(argv)
+    if len(args.source) > 1 and args.workers > 1: # options which do not work with several sources 不支持多个摄像头的选项
+        parser.error("--workers cannot be combined with several sources, every source already runs in its own process")
+    if args.workers > 1: # the pool detects every whole frame with a bare detector 进程池对每一帧整幅画面直接检测
+        for option, used in (("--detect-interval", args.detect_interval > 1), ("--roi-padding", args.roi_padding > 0),
+                             ("--motion-gate", args.motion_gate > 0), ("--foreground", args.foreground),
+                             ("--latency-budget", args.latency_budget > 0)):
+            if used:
+                parser.error("--workers cannot be combined with %s" % option)
+    if args.tiles: # tiles choose their own scale and face sizes per cascade 分块检测自行设置每个级联分类器的缩放和人脸尺寸
+        for option, used in (("--detector dnn", args.detector == "dnn"), ("--detect-scale", args.detect_scale != 1.0),
+                             ("--latency-budget", args.latency_budget > 0), ("--workers", args.workers > 1)):
+            if used:
+                parser.error("--tiles cannot be combined with %s" % option)
+    if args.luma and (not args.headless or args.detector == "dnn"): # the Y plane is a gray image 亮度通道是灰度图
+        parser.error("--luma needs --headless and a cascade --detector")
+    if args.foreground and args.roi_padding > 0: # the background model needs whole frames 背景模型需要完整画面
+        parser.error("--foreground already searches around the last faces and cannot be combined with --roi-padding")
+    return args
+
+
+def create_sender(args):
+    """Open the socket the messages are sent with.
+
+    Args:
+        args: options returned by parse_args()
+    Returns:
+        tuple (send, close), send is called with the (address, args) messages of one frame
+    """
+
+    if args.output == "bundle":
+        sender = OSCSender(args.ip, args.port)
+        return sender.send, sender.close ## all messages in one datagram 所有数据打包为一个数据包发送
+
+    client = udp_client.SimpleUDPClient(args.ip, args.port)
+
+    def send(messages):
+        for address, values in messages:
+            client.send_message(address, values)
+
+    return send, lambda: None
+
+
+def run_cameras(args, shutdown):
+    """Run several sources in one capture and detection process each and send their messages.
+
+    Args:
+        args: options returned by parse_args()
+        shutdown: GracefulShutdown instance
+    """
+
+    cameras = CameraProcesses(args.source, args) # a FacePipeline in one process per camera 每个摄像头一个进程
+    send, close_sender = create_sender(args) # one sender for all cameras 所有摄像头共用一个发送端
+
+    frame_count = 0
+    start_time = time.perf_counter()
+
+    try:
+        while cameras.running and not shutdown.requested:
+            for cam, messages in cameras.results(timeout=0.5): ## /cam/<n>/... of every camera 每个摄像头的数据
+                frame_count += 1
+                send(messages)
+    finally:
+        elapsed = time.perf_counter() - start_time
+        print("Processed %d frames in %.2f s (%.1f fps)" % (frame_count, elapsed, frame_count / elapsed))
+        print("Frames per camera:", cameras.frames)
+        cameras.close()
+        close_sender()
+
+
+def main(argv=None):
+    """Parse the command line and run until the source is exhausted or Ctrl+C is pressed
+
+    Args:
+        argv: list of command line arguments, sys.argv[1:] if None
+    """
+
+    args = parse_args(argv)
+    shutdown = GracefulShutdown()
+    shutdown.install() # stop cleanly on Ctrl+C or kill 按Ctrl+C或结束进程时正常退出
+
+    if len(args.source) > 1:
+        run_cameras(args, shutdown)
+
+        return
+
+    send, close_sender = create_sender(args) # one socket for the whole run 整个运行期间只使用一个socket
+    pipeline = FacePipeline(args, send)
+    try:
+        pipeline.run(shutdown)
+    finally:
+        pipeline.close()
+        close_sender()
+
+
+if __name__ == "__main__":
+    main()
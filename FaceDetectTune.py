@@ -0,0 +1,64 @@
+import argparse
+
+from facedetect import open_source, load_frames, load_labels, config_grid, sweep, pareto_front, CascadeDetector
+
+#Sweep the cascade parameters over a recorded clip and print the speed/recall Pareto front
+#在录制的视频上测试不同的检测参数，输出速度与召回率的最优组合
+
+
+def floats(text):
+    return [float(v) for v in text.split(",")]
+
+
+def ints(text):
+    return [int(v) for v in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", #video file, image folder or synthetic 视频文件、图片文件夹或synthetic
+        help="Video file, directory of images or 'synthetic'")
+    parser.add_argument("--labels",
+        help="JSON file mapping frame indexes to lists of [x, y, w, h] faces, "
+             "without it recall is measured against full-resolution detections with the smallest scaleFactor")
+    parser.add_argument("--cascade", default="haarcascade_frontalface_default.xml",
+        help="Cascade xml file")
+    parser.add_argument("--frames", type=int, default=200,
+        help="Maximum number of frames to use, 0 uses the whole clip")
+    parser.add_argument("--scale-factors", type=floats, default=[1.05, 1.1, 1.2, 1.3, 1.4],
+        help="Comma separated scaleFactor values")
+    parser.add_argument("--min-neighbors", type=ints, default=[3, 4, 5, 6],
+        help="Comma separated minNeighbors values")
+    parser.add_argument("--min-sizes", type=ints, default=[0, 40, 80],
+        help="Comma separated minSize values in source pixels, 0 for no limit")
+    parser.add_argument("--detect-scales", type=floats, default=[1.0, 0.75, 0.5, 0.35],
+        help="Comma separated detection scale values")
+    parser.add_argument("--processes", type=int, default=None,
+        help="Worker processes, the number of CPUs by default; timings are only comparable "
+             "while there are at least as many cores as processes")
+    parser.add_argument("--all", action="store_true",
+        help="Print every config, not only the Pareto front")
+    args = parser.parse_args()
+
+    source = open_source(args.source)
+    frames = load_frames(source, args.frames)
+    source.release()
+
+    if args.labels:
+        labels = load_labels(args.labels, len(frames))
+    else:
+        reference = CascadeDetector(args.cascade, min(args.scale_factors), 5)
+        labels = [reference.detect(gray)[0] for gray in frames]
+
+    configs = config_grid(args.scale_factors, args.min_neighbors, args.min_sizes, args.detect_scales)
+    print("Evaluating %d configs on %d frames with %d faces" % (len(configs), len(frames), sum(len(l) for l in labels)))
+
+    results = sweep(args.cascade, frames, labels, configs, args.processes)
+    front = pareto_front(results)
+
+    print("%-8s %-9s %-7s %-6s %9s %7s %9s" % ("scale", "scaleFac", "minNb", "minSz", "ms/frame", "recall", "precision"))
+    for result in sorted(results, key=lambda r: r.ms_per_frame) if args.all else front:
+        c = result.config
+        print("%-8.2f %-9.2f %-7d %-6d %9.2f %7.3f %9.3f %s" % (c.detect_scale, c.scale_factor, c.min_neighbors, c.min_size,
+                                                             result.ms_per_frame, result.recall, result.precision,
+                                                             "*" if result in front else ""))
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect
+    ~~~~~~~~~~
+
+    Building blocks of the face detection pipeline used by FaceDetectSendOSC.py
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+from .capture import *
+from .detect import *
+from .tracking import *
+from .motion import *
+from .pool import *
+from .snapshot import *
+from .pacing import *
+from .quality import *
+from .output import *
+from .smoothing import *
+from .sources import *
+from .stats import *
+from .tune import *
+from .pipeline import *
+from .multicam import *
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.capture
+    ~~~~~~~~~~~~~~~~~~
+
+    Frame capture stages
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import threading
+
+import numpy as np
+import cv2
+
+__all__ = [
+    'LatestFrameCapture',
+    'luma_view',
+    'request_luma'
+    ]
+
+
+def luma_view(frame, size):
+    """Returns the Y plane of a raw YUV frame as a view, without copying.
+
+    Packed YUYV frames give a strided view of every other byte, planar
+    NV12/I420 frames a view of their first rows.
+
+    Args:
+        frame: raw frame read with CAP_PROP_CONVERT_RGB off
+        size (tuple): frame (width, height)
+    Returns:
+        8-bit (height, width) array sharing memory with frame, None if the layout is unknown
+    """
+
+    cols, rows = size
+
+    if not isinstance(frame, np.ndarray) or frame.dtype != np.uint8:
+        return None
+
+    if frame.ndim == 3 and frame.shape == (rows, cols, 2):
+        return frame[:, :, 0]
+
+    if frame.ndim == 2 and frame.shape == (rows * 3 // 2, cols):
+        return frame[:rows]
+
+    if frame.size == rows * cols * 2 and frame.flags['C_CONTIGUOUS']:
+        return frame.reshape(rows, cols, 2)[:, :, 0]
+
+    return None
+
+
+def request_luma(capture):
+    """Ask a camera for raw YUYV frames so the Y plane can be used without cvtColor.
+
+    A probe frame is read to check the backend really delivers a layout
+    luma_view() understands, otherwise BGR conversion is switched back on.
+
+    Args:
+        capture: opened cv2.VideoCapture of a camera
+    Returns:
+        frame (width, height) if raw frames are delivered, None if the backend does not support it
+    """
+
+    capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'YUYV'))
+
+    if capture.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        ret, frame = capture.read()
+
+        if ret and luma_view(frame, size) is not None:
+            return size
+
+    capture.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+
+    return None
+
+
+class LatestFrameCapture(object):
+    """Read a cv2.VideoCapture on a background thread and keep only the newest frame.
+
+    The camera is drained as fast as it delivers frames, so old frames never
+    pile up in the driver buffer. A frame which is replaced before anybody
+    read it is counted as dropped.
+
+    The thread reads into two buffers in turn. A reader which passes its own
+    buffer to read(image=...) gets a copy of the newest frame, so no frame
+    memory is allocated once the loop runs.
+    """
+
+    def __init__(self, capture):
+        """Start the capture thread.
+
+        Args:
+            capture: opened cv2.VideoCapture (or any object with read() and release())
+        """
+
+        self._capture = capture
+        self._cond = threading.Condition()
+        self._ret = False
+        self._frame = None
+        self._spare = None
+        self._grabbed = 0
+        self._sequence = 0
+        self._dropped = 0
+        self._running = True
+        self._released = False
+
+        self._thread = threading.Thread(target=self._run, name="LatestFrameCapture")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def grabbed(self):
+        """Returns number of frames grabbed from the camera"""
+
+        return self._grabbed
+
+    @property
+    def sequence(self):
+        """Returns sequence number of the last frame returned by read()"""
+
+        return self._sequence
+
+    @property
+    def dropped(self):
+        """Returns number of frames replaced before they were read"""
+
+        return self._dropped
+
+    def isOpened(self):
+        """Returns True if the underlying capture is opened"""
+
+        return self._capture.isOpened()
+
+    def _run(self):
+        """Capture thread: grab frames until released or the source is exhausted"""
+
+        while self._running:
+            # the spare buffer is never referenced outside of this thread
+            if isinstance(self._spare, np.ndarray):
+                ret, frame = self._capture.read(image=self._spare)
+            else:
+                ret, frame = self._capture.read()
+
+            with self._cond:
+                if not ret:
+                    self._running = False
+                    self._cond.notify_all()
+
+                    break
+
+                if self._grabbed > self._sequence:
+                    self._dropped += 1
+
+                self._ret = ret
+                self._frame, self._spare = frame, self._frame
+                self._grabbed += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=None, image=None):
+        """Returns the newest frame which was not returned yet.
+
+        Blocks until the camera delivers a new frame.
+
+        Args:
+            timeout (float): seconds to wait for a frame, None waits forever
+            image: array the frame is copied into, if it has the frame shape and type
+        Returns:
+            tuple (ret, frame) like cv2.VideoCapture.read(),
+            (False, None) if the source is exhausted or timeout expired
+        """
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._grabbed > self._sequence or not self._running, timeout)
+
+            if self._released or self._grabbed == self._sequence:
+                return False, None
+
+            self._sequence = self._grabbed
+            frame = self._frame
+
+            if not isinstance(frame, np.ndarray):
+                return self._ret, frame
+
+            if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+                np.copyto(image, frame)
+
+                return self._ret, image
+
+            # the caller keeps this frame, the thread must not read into it again
+            self._frame = None
+
+            return self._ret, frame
+
+    def release(self):
+        """Stop the capture thread and release the camera"""
+
+        with self._cond:
+            self._running = False
+            self._released = True
+            self._cond.notify_all()
+
+        self._thread.join()
+        self._capture.release()
@@ -0,0 +1,577 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.detect
+    ~~~~~~~~~~~~~~~~~
+
+    Face detectors
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import queue
+import multiprocessing
+import concurrent.futures
+
+import numpy as np
+import cv2
+
+__all__ = [
+    'Detector',
+    'CascadeDetector',
+    'DnnDetector',
+    'RoiDetector',
+    'TiledDetector',
+    'DETECTORS',
+    'create_detector',
+    'no_faces',
+    'iou_matrix',
+    'nms',
+    'tile_windows',
+    'rescale_boxes',
+    'pad_boxes',
+    'merge_windows',
+    'detect_in_windows'
+    ]
+
+
+def no_faces():
+    """Returns empty (boxes, scores) detector output"""
+
+    return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32)
+
+
+def iou_matrix(a, b):
+    """Returns intersection over union of every box of a with every box of b.
+
+    Args:
+        a: array of (x, y, w, h) boxes, shape (N, 4)
+        b: array of (x, y, w, h) boxes, shape (M, 4)
+    Returns:
+        float array of shape (N, M)
+    """
+
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(1, -1, 4)
+
+    w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+
+    return inter / np.maximum(union, 1e-9)
+
+
+def nms(boxes, scores, threshold=0.3):
+    """Non-maximum suppression: drop boxes overlapping a box with a higher score.
+
+    Ties are broken in favor of the larger box.
+
+    Args:
+        boxes: array of (x, y, w, h) boxes
+        scores: score of every box
+        threshold (float): largest intersection over union of two kept boxes
+    Returns:
+        indexes of the kept boxes, best first
+    """
+
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    order = np.lexsort((-boxes[:, 2].astype(np.int64) * boxes[:, 3], -scores))
+    iou = iou_matrix(boxes[order], boxes[order])
+    keep = np.ones(len(order), dtype=bool)
+
+    for i in range(len(order)):
+        if keep[i]:
+            keep[i + 1:] &= iou[i, i + 1:] <= threshold
+
+    return order[keep]
+
+
+def rescale_boxes(boxes, scale):
+    """Map boxes found on a resized image back to source-resolution pixels.
+
+    Args:
+        boxes: array of (x, y, w, h) boxes found on the resized image
+        scale (float): factor the source image was resized with
+    Returns:
+        int32 array of shape (N, 4)
+    """
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+    if scale != 1.0:
+        boxes = np.rint(boxes / scale)
+
+    return boxes.astype(np.int32)
+
+
+def pad_boxes(boxes, padding, shape):
+    """Grow boxes by a fraction of their size and clip them to the frame.
+
+    Args:
+        boxes: array of (x, y, w, h) boxes
+        padding (float): padding added on every side as a fraction of the box size
+        shape (tuple): frame shape (rows, cols)
+    Returns:
+        int32 array of (x0, y0, x1, y1) windows
+    """
+
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    pad = (boxes[:, 2:] * padding).astype(np.int32)
+    windows = np.hstack((boxes[:, :2] - pad, boxes[:, :2] + boxes[:, 2:] + pad))
+
+    np.clip(windows[:, 0::2], 0, shape[1], out=windows[:, 0::2])
+    np.clip(windows[:, 1::2], 0, shape[0], out=windows[:, 1::2])
+
+    return windows
+
+
+def merge_windows(windows):
+    """Replace overlapping windows by their bounding window.
+
+    Args:
+        windows: array of (x0, y0, x1, y1) windows
+    Returns:
+        list of (x0, y0, x1, y1) tuples which do not overlap
+    """
+
+    merged = [tuple(int(v) for v in window) for window in windows]
+    changed = True
+
+    while changed:
+        changed = False
+
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    merged[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del merged[j]
+                    changed = True
+
+                    break
+
+            if changed:
+                break
+
+    return merged
+
+
+def tile_windows(shape, tile, overlap):
+    """Cover a frame with overlapping square tiles.
+
+    Args:
+        shape (tuple): frame shape (rows, cols)
+        tile (int): tile width and height in pixels
+        overlap (int): pixels shared by neighboring tiles
+    Returns:
+        list of (x0, y0, x1, y1) windows, the last row and column end at the frame edge
+    """
+
+    step = max(tile - overlap, 1)
+    starts = []
+
+    for size in shape[:2]:
+        last = max(size - tile, 0)
+        starts.append(sorted(set(list(range(0, last, step)) + [last])))
+
+    return [(x, y, min(x + tile, shape[1]), min(y + tile, shape[0])) for y in starts[0] for x in starts[1]]
+
+
+def detect_in_windows(detector, frame, windows):
+    """Run a detector inside windows of a frame.
+
+    Args:
+        detector: Detector instance
+        frame: frame the detector accepts
+        windows: list of non-overlapping (x0, y0, x1, y1) windows
+    Returns:
+        tuple (boxes, scores), boxes in frame coordinates
+    """
+
+    found = []
+    found_scores = []
+
+    for (x0, y0, x1, y1) in windows:
+        boxes, scores = detector.detect(frame[y0:y1, x0:x1])
+
+        if len(boxes):
+            found.append(boxes + np.array([x0, y0, 0, 0], dtype=np.int32))
+            found_scores.append(scores)
+
+    if not found:
+        return no_faces()
+
+    return np.vstack(found), np.concatenate(found_scores)
+
+
+class Detector(object):
+    """Base class of the face detector backends.
+
+    A backend finds faces on a frame and returns them as a tuple (boxes, scores):
+    an int32 array of (x, y, w, h) boxes in source-resolution pixels and a
+    float32 array with a confidence for every box.
+    """
+
+    # True if the backend wants BGR frames instead of grayscale ones
+    color = False
+
+    def detect(self, frame):
+        """Find faces on a frame.
+
+        Args:
+            frame: 8-bit grayscale image, or BGR image if color is True
+        Returns:
+            tuple (boxes, scores)
+        Raises:
+            NotImplementedError if you don't override it
+        """
+
+        raise NotImplementedError("Re-implement this method")
+
+
+class CascadeDetector(Detector):
+    """Detect faces with a cv2.CascadeClassifier (Haar or LBP), optionally on a downscaled copy of the frame"""
+
+    def __init__(self, path, scale_factor=1.3, min_neighbors=5, min_size=None, detect_scale=1.0, max_size=None,
+                 min_score=None):
+        """Load the cascade.
+
+        Args:
+            path (str): path to the cascade xml file
+            scale_factor (float): scaleFactor passed to detectMultiScale
+            min_neighbors (int): minNeighbors passed to detectMultiScale
+            min_size (tuple): smallest face (w, h) in source pixels, None for no limit
+            detect_scale (float): resize factor applied before detection, 1.0 detects on the full frame
+            max_size (tuple): largest face (w, h) in source pixels, None for no limit
+            min_score (float): smallest level weight of a reported face, None keeps all faces
+        Raises:
+            IOError if the cascade could not be loaded
+            ValueError if detect_scale is invalid
+        """
+
+        self._cascade = cv2.CascadeClassifier(path)
+
+        if self._cascade.empty():
+            raise IOError("Could not load cascade %s" % path)
+
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_score = min_score
+        self.detect_scale = detect_scale
+
+        # downscaled frame, reused while the frame size does not change
+        self._small = None
+
+    @property
+    def detect_scale(self):
+        """Returns resize factor applied before detection"""
+
+        return self._detect_scale
+
+    @detect_scale.setter
+    def detect_scale(self, value):
+        """Set resize factor applied before detection
+
+        Args:
+            value (float): factor in range (0, 1]
+        Raises:
+            ValueError if value is out of range
+        """
+
+        if not 0.0 < value <= 1.0:
+            raise ValueError("Detection scale must be in range (0, 1]")
+
+        self._detect_scale = float(value)
+
+    def detect(self, gray):
+        """Find faces on a grayscale frame.
+
+        Args:
+            gray: 8-bit grayscale image
+        Returns:
+            tuple (boxes, scores), the scores are the level weights of the last cascade stage,
+            unbounded and higher for more certain faces
+        """
+
+        scale = self._detect_scale
+        min_size = max_size = None
+
+        if scale != 1.0:
+            size = (int(round(gray.shape[1] * scale)), int(round(gray.shape[0] * scale)))
+            gray = self._small = cv2.resize(gray, size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        if self.min_size:
+            min_size = (int(self.min_size[0] * scale), int(self.min_size[1] * scale))
+
+        if self.max_size:
+            max_size = (int(self.max_size[0] * scale), int(self.max_size[1] * scale))
+
+        faces, _, weights = self._cascade.detectMultiScale3(gray, self.scale_factor, self.min_neighbors,
+                                                            minSize=min_size, maxSize=max_size,
+                                                            outputRejectLevels=True)
+        boxes = rescale_boxes(faces, scale)
+        scores = np.asarray(weights, dtype=np.float32).reshape(-1)
+
+        if self.min_score is not None:
+            keep = scores >= self.min_score
+            boxes, scores = boxes[keep], scores[keep]
+
+        return boxes, scores
+
+
+class DnnDetector(Detector):
+    """Detect faces with the OpenCV res10 SSD face model on the CPU backend of cv2.dnn"""
+
+    color = True
+
+    # mean BGR values the res10 model was trained with
+    _MEAN = (104.0, 177.0, 123.0)
+
+    def __init__(self, model, config, confidence=0.5, input_size=300, min_size=None):
+        """Load the network.
+
+        Args:
+            model (str): path to res10_300x300_ssd_iter_140000.caffemodel
+            config (str): path to deploy.prototxt
+            confidence (float): smallest confidence of a reported face
+            input_size (int): network input width and height
+            min_size (tuple): smallest face (w, h) in source pixels, None for no limit
+        Raises:
+            IOError if the network could not be loaded
+        """
+
+        try:
+            self._net = cv2.dnn.readNet(model, config)
+        except cv2.error as e:
+            raise IOError("Could not load network %s: %s" % (model, e))
+
+        self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self._net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+        self.confidence = confidence
+        self.input_size = input_size
+        self.min_size = min_size
+
+    def detect(self, frame):
+        """Find faces on a frame.
+
+        Args:
+            frame: 8-bit BGR or grayscale image
+        Returns:
+            tuple (boxes, scores), scores are the network confidences
+        """
+
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+        rows, cols = frame.shape[:2]
+        size = (self.input_size, self.input_size)
+
+        self._net.setInput(cv2.dnn.blobFromImage(frame, 1.0, size, self._MEAN, swapRB=False, crop=False))
+        detections = self._net.forward().reshape(-1, 7)
+        detections = detections[detections[:, 2] >= self.confidence]
+
+        corners = np.clip(detections[:, 3:7], 0.0, 1.0) * np.array([cols, rows, cols, rows], dtype=np.float32)
+        boxes = np.rint(np.hstack((corners[:, :2], corners[:, 2:] - corners[:, :2]))).astype(np.int32)
+        scores = detections[:, 2].astype(np.float32)
+
+        keep = (boxes[:, 2] > 0) & (boxes[:, 3] > 0)
+
+        if self.min_size:
+            keep &= (boxes[:, 2] >= self.min_size[0]) & (boxes[:, 3] >= self.min_size[1])
+
+        return boxes[keep], scores[keep]
+
+
+# default model files of every backend, relative to the working directory
+DETECTORS = {
+    'haar': ('haarcascade_frontalface_default.xml', None),
+    'lbp': ('lbpcascade_frontalface_improved.xml', None),
+    'dnn': ('res10_300x300_ssd_iter_140000.caffemodel', 'deploy.prototxt'),
+    }
+
+
+def create_detector(kind='haar', model=None, config=None, scale_factor=1.3, min_neighbors=5, min_size=None,
+                    detect_scale=1.0, confidence=0.5, min_score=None):
+    """Create a detector backend by name.
+
+    Args:
+        kind (str): 'haar', 'lbp' or 'dnn'
+        model (str): cascade xml or network weights, the default file of the backend if None
+        config (str): network description, only used by 'dnn'
+        scale_factor (float): scaleFactor of the cascades
+        min_neighbors (int): minNeighbors of the cascades
+        min_size (tuple): smallest face (w, h) in source pixels
+        detect_scale (float): resize factor applied before detection by the cascades
+        confidence (float): smallest confidence reported by 'dnn'
+        min_score (float): smallest level weight reported by the cascades, None keeps all faces
+    Returns:
+        Detector instance
+    Raises:
+        ValueError if kind is unknown
+        IOError if the model could not be loaded
+    """
+
+    if kind not in DETECTORS:
+        raise ValueError("Unknown detector %s, expected one of %s" % (kind, ", ".join(sorted(DETECTORS))))
+
+    default_model, default_config = DETECTORS[kind]
+
+    if kind == 'dnn':
+        return DnnDetector(model or default_model, config or default_config, confidence, min_size=min_size)
+
+    return CascadeDetector(model or default_model, scale_factor, min_neighbors, min_size, detect_scale,
+                           min_score=min_score)
+
+
+class TiledDetector(object):
+    """Detect faces on high-resolution frames in overlapping tiles on a thread pool.
+
+    The tiles are derived from the smallest face: they overlap by
+    `overlap` pixels, so every face up to that size lies inside one tile,
+    and the tiles search only faces between min_face and overlap. Larger
+    faces are found by one extra pass on a copy of the whole frame
+    downscaled until they are small. The boxes of all tiles are merged
+    with non-maximum suppression.
+
+    OpenCV releases the GIL during detection, so the tiles run in
+    parallel. Every thread gets its own detector, a cascade must not be
+    used by two threads at once.
+    """
+
+    def __init__(self, factory, min_face=40, threads=None, tile=None, overlap=None, iou_threshold=0.3):
+        """Create the detectors and the thread pool.
+
+        Args:
+            factory: function returning a new Detector
+            min_face (int): smallest face in source pixels
+            threads (int): number of threads, the number of CPUs if None
+            tile (int): tile size in pixels, 8 * min_face if None
+            overlap (int): tile overlap in pixels, 2 * min_face if None
+            iou_threshold (float): largest intersection over union of two reported faces
+        """
+
+        self.min_face = min_face
+        self.tile = tile or 8 * min_face
+        self.overlap = overlap or 2 * min_face
+        self.iou_threshold = iou_threshold
+
+        threads = threads or multiprocessing.cpu_count()
+
+        self._detectors = queue.Queue()
+
+        for _ in range(threads):
+            detector = factory()
+            detector.min_size = (min_face, min_face)
+            detector.max_size = (self.overlap, self.overlap)
+            self._detectors.put(detector)
+
+        # the cascade needs faces of about min_face pixels, faces from overlap on are searched downscaled
+        self._coarse = factory()
+        self._coarse.detect_scale = min(float(min_face) / self.overlap, 1.0)
+        self._coarse.min_size = (self.overlap, self.overlap)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(threads)
+
+    @property
+    def color(self):
+        """Returns True if the detectors want BGR frames"""
+
+        return self._coarse.color
+
+    def _detect_window(self, frame, window):
+        """Detect one tile with a free detector, returns (boxes, scores) in frame coordinates"""
+
+        detector = self._detectors.get()
+
+        try:
+            return detect_in_windows(detector, frame, [window])
+        finally:
+            self._detectors.put(detector)
+
+    def detect(self, frame):
+        """Returns (boxes, scores) of the faces on the frame
+
+        Args:
+            frame: frame the detectors accept
+        """
+
+        windows = tile_windows(frame.shape, self.tile, self.overlap)
+        futures = [self._executor.submit(self._detect_window, frame, window) for window in windows]
+        coarse = self._executor.submit(self._coarse.detect, frame)
+
+        results = [future.result() for future in futures] + [coarse.result()]
+        boxes = np.vstack([r[0] for r in results])
+        scores = np.concatenate([r[1] for r in results])
+
+        if len(boxes) < 2:
+            return boxes, scores
+
+        keep = nms(boxes, scores, self.iou_threshold)
+
+        return boxes[keep], scores[keep]
+
+    def close(self):
+        """Stop the threads"""
+
+        self._executor.shutdown()
+
+
+class RoiDetector(object):
+    """Search only padded windows around the faces found on the previous frame.
+
+    The whole frame is scanned every full_scan_interval frames, when no face
+    was known or when a known face was not found again.
+    """
+
+    def __init__(self, detector, padding=0.5, full_scan_interval=30):
+        """Wrap a detector.
+
+        Args:
+            detector: Detector instance
+            padding (float): window padding as a fraction of the face size, 0 always scans the whole frame
+            full_scan_interval (int): scan the whole frame at least every N frames
+        """
+
+        self.detector = detector
+        self.padding = padding
+        self.full_scan_interval = full_scan_interval
+
+        self._boxes = np.empty((0, 4), dtype=np.int32)
+        self._since_full_scan = 0
+
+    @property
+    def color(self):
+        """Returns True if the wrapped detector wants BGR frames"""
+
+        return self.detector.color
+
+    def detect(self, frame):
+        """Returns (boxes, scores) of the faces on the frame
+
+        Args:
+            frame: frame the wrapped detector accepts
+        """
+
+        self._since_full_scan += 1
+
+        if self.padding > 0 and len(self._boxes) and self._since_full_scan < self.full_scan_interval:
+            windows = merge_windows(pad_boxes(self._boxes, self.padding, frame.shape))
+            boxes, scores = detect_in_windows(self.detector, frame, windows)
+
+            if len(boxes) >= len(self._boxes):
+                self._boxes = boxes
+
+                return boxes, scores
+
+        boxes, scores = self.detector.detect(frame)
+        self._boxes = boxes
+        self._since_full_scan = 0
+
+        return boxes, scores
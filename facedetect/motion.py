@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.motion
+    ~~~~~~~~~~~~~~~~~
+
+    Motion analysis which spares the detector work on static parts of the scene
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import numpy as np
+import cv2
+
+from .detect import no_faces, rescale_boxes, pad_boxes, merge_windows, detect_in_windows
+
+__all__ = [
+    'MotionGate',
+    'ForegroundDetector'
+    ]
+
+
+class MotionGate(object):
+    """Run a detector only when the scene changed since its last run.
+
+    Every frame is reduced to a thumbnail `width` pixels wide and compared
+    with the thumbnail of the last detection. While fewer than `threshold`
+    of its pixels changed by more than `pixel_threshold` gray levels, the
+    previous result is returned without running the detector. Comparing
+    against the last detection instead of the previous frame also catches
+    slow movements.
+    """
+
+    def __init__(self, detector, threshold=0.002, pixel_threshold=12, width=64, refresh_interval=300):
+        """Wrap a detector.
+
+        Args:
+            detector: Detector instance
+            threshold (float): fraction of changed thumbnail pixels which counts as motion
+            pixel_threshold (int): gray level difference of a changed pixel
+            width (int): thumbnail width in pixels
+            refresh_interval (int): run the detector at least every N frames, so slow lighting changes are caught
+        """
+
+        self.detector = detector
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.width = width
+        self.refresh_interval = refresh_interval
+
+        self._small = None
+        self._thumbnail = None
+        self._reference = None
+        self._diff = None
+        self._boxes, self._scores = no_faces()
+        self._since_detect = refresh_interval
+        self._skipped = 0
+
+    @property
+    def color(self):
+        """Returns True if the wrapped detector wants BGR frames"""
+
+        return self.detector.color
+
+    @property
+    def skipped(self):
+        """Returns number of frames the detector did not run on"""
+
+        return self._skipped
+
+    def moved(self, frame):
+        """Returns True if the frame differs from the frame of the last detection.
+
+        Args:
+            frame: 8-bit grayscale or BGR frame
+        """
+
+        rows, cols = frame.shape[:2]
+        size = (self.width, max(int(round(rows * self.width / float(cols))), 1))
+
+        thumbnail = self._small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY, dst=self._thumbnail)
+
+        self._thumbnail = thumbnail
+
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            return True
+
+        self._diff = cv2.absdiff(thumbnail, self._reference, dst=self._diff)
+
+        return np.count_nonzero(self._diff > self.pixel_threshold) > self.threshold * self._diff.size
+
+    def detect(self, frame):
+        """Returns (boxes, scores) of the faces on the frame
+
+        Args:
+            frame: frame the wrapped detector accepts
+        """
+
+        self._since_detect += 1
+
+        if not self.moved(frame) and self._since_detect < self.refresh_interval:
+            self._skipped += 1
+
+            return self._boxes.copy(), self._scores.copy()
+
+        self._boxes, self._scores = self.detector.detect(frame)
+        self._since_detect = 0
+
+        if self._reference is None or self._reference.shape != self._thumbnail.shape:
+            self._reference = self._thumbnail.copy()
+        else:
+            np.copyto(self._reference, self._thumbnail)
+
+        return self._boxes.copy(), self._scores.copy()
+
+
+class ForegroundDetector(object):
+    """Run a detector only inside padded boxes of the moving foreground.
+
+    A MOG2 background model on a frame reduced to `width` pixels finds the
+    foreground blobs. The detector searches the padded bounding boxes of the
+    blobs and of the faces found on the previous frame, so people who stop
+    moving and fade into the background are still followed. The whole frame
+    is scanned every full_scan_interval frames.
+
+    The background model must see whole frames of one size, so the detector
+    must not be wrapped in a RoiDetector that passes crops. It only learns
+    from the frames passed to detect(); behind DetectThenTrack with interval
+    N its history of `history` frames covers N times as much time.
+    """
+
+    def __init__(self, detector, width=160, padding=0.5, min_area=0.002, full_scan_interval=150, history=500,
+                 var_threshold=16):
+        """Wrap a detector.
+
+        Args:
+            detector: Detector instance
+            width (int): width in pixels of the frame the background model runs on
+            padding (float): padding added around every blob as a fraction of its size
+            min_area (float): smallest blob as a fraction of the frame area
+            full_scan_interval (int): scan the whole frame at least every N frames
+            history (int): history of cv2.createBackgroundSubtractorMOG2
+            var_threshold (float): varThreshold of cv2.createBackgroundSubtractorMOG2
+        """
+
+        self.detector = detector
+        self.width = width
+        self.padding = padding
+        self.min_area = min_area
+        self.full_scan_interval = full_scan_interval
+
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(history, var_threshold, True)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._small = None
+        self._mask = None
+        self._boxes = np.empty((0, 4), dtype=np.int32)
+        self._since_full_scan = full_scan_interval
+        self._frames = 0
+        self._scanned = 0.0
+
+    @property
+    def color(self):
+        """Returns True if the wrapped detector wants BGR frames"""
+
+        return self.detector.color
+
+    @property
+    def coverage(self):
+        """Returns average fraction of the frame area the detector ran on"""
+
+        return self._scanned / self._frames if self._frames else 0.0
+
+    def regions(self, frame):
+        """Update the background model and return the foreground blobs.
+
+        Args:
+            frame: 8-bit grayscale or BGR frame
+        Returns:
+            int32 array of (x, y, w, h) blob boxes in frame coordinates
+        """
+
+        rows, cols = frame.shape[:2]
+        scale = min(self.width / float(cols), 1.0)
+        size = (max(int(round(cols * scale)), 1), max(int(round(rows * scale)), 1))
+
+        small = self._small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        mask = self._mask = self._subtractor.apply(small, self._mask)
+
+        # shadows are marked 127, keep only the foreground at 255
+        cv2.threshold(mask, 200, 255, cv2.THRESH_BINARY, dst=mask)
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel, dst=mask)
+        cv2.dilate(mask, self._kernel, dst=mask, iterations=2)
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        stats = stats[1:]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area * mask.size]
+
+        return rescale_boxes(stats[:, :4], scale)
+
+    def detect(self, frame):
+        """Returns (boxes, scores) of the faces on the frame
+
+        Args:
+            frame: frame the wrapped detector accepts
+        """
+
+        # the background model learns from every frame passed to detect(); behind a
+        # DetectThenTrack or MotionGate that is only the frames the detector runs on
+        regions = self.regions(frame)
+        self._since_full_scan += 1
+        self._frames += 1
+
+        if self._since_full_scan >= self.full_scan_interval:
+            boxes, scores = self.detector.detect(frame)
+            self._since_full_scan = 0
+            self._scanned += 1.0
+        else:
+            candidates = np.vstack((regions, self._boxes))
+            windows = merge_windows(pad_boxes(candidates, self.padding, frame.shape))
+            boxes, scores = detect_in_windows(self.detector, frame, windows)
+            self._scanned += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in windows) / \
+                float(frame.shape[0] * frame.shape[1])
+
+        self._boxes = boxes
+
+        return boxes, scores
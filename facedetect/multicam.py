@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.multicam
+    ~~~~~~~~~~~~~~~~~~~
+
+    Several cameras with one capture and detection process per source
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import copy
+import time
+import queue
+import signal
+import multiprocessing
+
+from .output import namespace_messages
+from .pipeline import FacePipeline
+
+__all__ = [
+    'CameraProcesses',
+    'camera_snapshot',
+    'run_camera'
+    ]
+
+
+def run_camera(spec, send, stop, args, name=None):
+    """Run a FacePipeline on one source until it is exhausted or stop is set.
+
+    Args:
+        spec (str): source specification, see open_source()
+        send: function called with the list of (address, args) messages of every frame
+        stop: multiprocessing.Event which ends the loop
+        args: options returned by parse_args() of FaceDetectSendOSC.py
+        name (str): preview window title and prefix of the summary
+    Returns:
+        number of processed frames
+    """
+
+    pipeline = FacePipeline(args, send, spec, name)
+
+    try:
+        while not stop.is_set() and pipeline.step():
+            pass
+    finally:
+        pipeline.close()
+
+    return pipeline.frame_count
+
+
+def camera_snapshot(path, index):
+    """Returns the snapshot file of camera index, e.g. 1_cam0.png for 1.png"""
+
+    root, ext = os.path.splitext(path)
+
+    return '%s_cam%d%s' % (root, index, ext)
+
+
+def _camera_process(index, spec, results, stop, args):
+    """Run one camera and put (index, messages) of every frame on the result queue"""
+
+    # the main process decides when to stop, terminate() must not run its SIGTERM handler
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    prefix = '/cam/%d' % index
+
+    def send(messages):
+        results.put((index, namespace_messages(messages, prefix)))
+
+    args = copy.copy(args)
+
+    if args.snapshot:
+        args.snapshot = camera_snapshot(args.snapshot, index)
+
+    try:
+        run_camera(spec, send, stop, args, 'cam%d' % index)
+    finally:
+        # tell the main process this camera is finished
+        results.put((index, None))
+
+
+class CameraProcesses(object):
+    """Capture and detect every source in its own process.
+
+    The messages of camera n are addressed /cam/<n>/..., e.g. /cam/1/face/count,
+    and come back through one queue, so a single sender in the main process
+    serves all cameras. Cameras run in parallel, the total frame rate grows
+    with the number of cores. Every camera runs a FacePipeline with the same
+    options, its snapshot file is named by camera_snapshot().
+    """
+
+    def __init__(self, sources, args):
+        """Start one process per source.
+
+        Args:
+            sources: list of source specifications, see open_source()
+            args: options returned by parse_args() of FaceDetectSendOSC.py, --workers must be 1
+        """
+
+        self._results = multiprocessing.Queue()
+        self._stop = multiprocessing.Event()
+        self._frames = [0] * len(sources)
+        self._running = len(sources)
+        self._processes = []
+
+        for index, spec in enumerate(sources):
+            process = multiprocessing.Process(target=_camera_process,
+                                              args=(index, spec, self._results, self._stop, args),
+                                              name="Camera%d" % index)
+            process.daemon = True
+            process.start()
+
+            self._processes.append(process)
+
+    @property
+    def frames(self):
+        """Returns list with the number of frames processed by every camera"""
+
+        return list(self._frames)
+
+    @property
+    def running(self):
+        """Returns True while at least one camera delivers frames"""
+
+        return self._running > 0
+
+    def results(self, timeout=None):
+        """Returns the messages of the frames finished since the last call.
+
+        Args:
+            timeout (float): seconds to wait for the first frame, None waits forever
+        Returns:
+            list of (camera index, messages) tuples
+        """
+
+        ready = []
+        block = True
+
+        while self._running > 0:
+            try:
+                index, messages = self._results.get(block, timeout)
+            except queue.Empty:
+                break
+
+            block = False
+
+            if messages is None:
+                self._running -= 1
+            else:
+                self._frames[index] += 1
+                ready.append((index, messages))
+
+        return ready
+
+    def close(self, timeout=5.0):
+        """Stop the cameras and wait for the processes.
+
+        Args:
+            timeout (float): seconds to wait for every process before it is terminated
+        """
+
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+
+        # drain the queue, a process does not exit while its messages are not flushed
+        while self._running > 0 and time.monotonic() < deadline:
+            self.results(timeout=0.1)
+
+        for process in self._processes:
+            process.join(max(deadline - time.monotonic(), 0))
+
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.output
+    ~~~~~~~~~~~~~~~~~
+
+    OSC output of detected faces
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import re
+import time
+
+import osc
+
+__all__ = [
+    'OSCSender',
+    'DeltaFilter',
+    'PresenceTracker',
+    'face_messages',
+    'face_id_messages',
+    'namespace_messages'
+    ]
+
+
+def _box_values(box, shape, normalize):
+    """Returns x, y, w, h of a box as python ints or as floats normalized to the frame size"""
+
+    if normalize:
+        rows, cols = shape[:2]
+
+        return [float(box[0]) / cols, float(box[1]) / rows, float(box[2]) / cols, float(box[3]) / rows]
+
+    return [int(v) for v in box]
+
+
+def face_messages(faces, shape=None, normalize=False, scores=None):
+    """Describe the faces of a frame as OSC messages.
+
+    Produces /face/count with the number of faces, followed by /face/<i>
+    with x, y, w, h of every face and /face/<i>/score if scores are given.
+
+    Args:
+        faces: array of (x, y, w, h) boxes
+        shape (tuple): frame shape (rows, cols), required to normalize
+        normalize (bool): send coordinates as floats in range [0, 1] of the frame size
+        scores: detector confidence of every face, None sends no scores
+    Returns:
+        list of (address, args) tuples
+    """
+
+    messages = [('/face/count', [len(faces)])]
+
+    for i, box in enumerate(faces):
+        messages.append(('/face/%d' % i, _box_values(box, shape, normalize)))
+
+        if scores is not None:
+            messages.append(('/face/%d/score' % i, [float(scores[i])]))
+
+    return messages
+
+
+def face_id_messages(ids, faces, shape=None, normalize=False, scores=None):
+    """Describe tracked faces as OSC messages addressed by face id.
+
+    Produces /face/count, /face/ids with the ids of the visible faces and
+    /face/<id>/x, /face/<id>/y, /face/<id>/w, /face/<id>/h for every face,
+    plus /face/<id>/score if scores are given.
+
+    Args:
+        ids: id of every face
+        faces: array of (x, y, w, h) boxes
+        shape (tuple): frame shape (rows, cols), required to normalize
+        normalize (bool): send coordinates as floats in range [0, 1] of the frame size
+        scores: detector confidence of every face, None sends no scores
+    Returns:
+        list of (address, args) tuples
+    """
+
+    messages = [('/face/count', [len(faces)]), ('/face/ids', [int(i) for i in ids])]
+
+    for n, (i, box) in enumerate(zip(ids, faces)):
+        for name, value in zip('xywh', _box_values(box, shape, normalize)):
+            messages.append(('/face/%d/%s' % (i, name), [value]))
+
+        if scores is not None:
+            messages.append(('/face/%d/score' % i, [float(scores[n])]))
+
+    return messages
+
+
+def namespace_messages(messages, prefix):
+    """Returns the messages with prefix put in front of every address.
+
+    Args:
+        messages: list of (address, args) tuples
+        prefix (str): address prefix such as '/cam/1'
+    """
+
+    return [(prefix + address, args) for address, args in messages]
+
+
+# face coordinates, the only values the DeltaFilter threshold applies to
+_BOX_ADDRESS = re.compile(r'^(/FPosX|/face/\d+(/[xywh])?)$')
+
+
+class DeltaFilter(object):
+    """Drop messages whose values did not change since they were last sent.
+
+    The threshold only hides jitter of face coordinates; counts, ids,
+    flags and scores are sent on every change. A periodic heartbeat lets
+    the full state through, so receivers recover from lost UDP datagrams.
+    Addresses missing from a frame are forgotten and sent again as soon as
+    they come back.
+    """
+
+    def __init__(self, threshold=0.0, heartbeat=1.0):
+        """Create the filter without state.
+
+        Args:
+            threshold (float): coordinates must change by more than this to be sent again
+            heartbeat (float): seconds between full-state sends, 0 disables the heartbeat
+        """
+
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+
+        self._last = {}
+        self._last_heartbeat = None
+        self._sent = 0
+        self._suppressed = 0
+
+    @property
+    def sent(self):
+        """Returns number of messages let through"""
+
+        return self._sent
+
+    @property
+    def suppressed(self):
+        """Returns number of messages dropped because nothing changed"""
+
+        return self._suppressed
+
+    def _changed(self, address, old, new):
+        """Returns True if the argument lists differ, coordinates by more than the threshold"""
+
+        if old is None or len(old) != len(new):
+            return True
+
+        if not self.threshold or not _BOX_ADDRESS.match(address):
+            return old != new
+
+        for a, b in zip(old, new):
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                if abs(a - b) > self.threshold:
+                    return True
+            elif a != b:
+                return True
+
+        return False
+
+    def filter(self, messages, now=None):
+        """Returns the messages which have to be sent.
+
+        Args:
+            messages: list of (address, args) tuples describing the full state
+            now (float): current time in seconds, time.monotonic() if None
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        full = self._last_heartbeat is None or (self.heartbeat > 0 and now - self._last_heartbeat >= self.heartbeat)
+
+        if full:
+            self._last_heartbeat = now
+
+        changed = []
+        last = {}
+
+        for address, args in messages:
+            old = self._last.get(address)
+
+            if full or self._changed(address, old, args):
+                old = args
+                changed.append((address, args))
+
+            last[address] = old
+
+        # addresses of faces which left are dropped, ids are never reused
+        self._last = last
+
+        self._sent += len(changed)
+        self._suppressed += len(messages) - len(changed)
+
+        return changed
+
+
+class PresenceTracker(object):
+    """Debounce the face count into enter and leave events.
+
+    Faces have to be seen for enter_time seconds before /face/enter is sent
+    and be missing for leave_time seconds before /face/leave is sent, so a
+    missed detection or a single false face does not toggle the state. The
+    events are sent once; /face/present follows every change of the state
+    and is repeated every keepalive seconds, so receivers recover from a
+    lost event.
+    """
+
+    def __init__(self, enter_time=0.2, leave_time=1.0, keepalive=1.0):
+        """Create the tracker with nobody present.
+
+        Args:
+            enter_time (float): seconds faces must be seen before they count as present
+            leave_time (float): seconds faces must be missing before they count as gone
+            keepalive (float): seconds between repeats of /face/present, 0 sends it only on changes
+        """
+
+        self.enter_time = enter_time
+        self.leave_time = leave_time
+        self.keepalive = keepalive
+
+        self._present = False
+        self._changing_since = None
+        self._enter_time = None
+        self._last_seen = None
+        self._last_state = None
+
+    @property
+    def present(self):
+        """Returns True while somebody is present"""
+
+        return self._present
+
+    def duration(self, now=None):
+        """Returns seconds since the last enter event, 0.0 while nobody is present"""
+
+        if not self._present:
+            return 0.0
+
+        return (time.monotonic() if now is None else now) - self._enter_time
+
+    def _events(self, count, now):
+        """Returns the enter or leave event caused by the faces of a frame"""
+
+        seen = count > 0
+
+        if seen:
+            self._last_seen = now
+
+        if seen == self._present:
+            self._changing_since = None
+
+            return []
+
+        if self._changing_since is None:
+            self._changing_since = now
+
+        if now - self._changing_since < (self.enter_time if seen else self.leave_time):
+            return []
+
+        self._present = seen
+        self._changing_since = None
+
+        if seen:
+            self._enter_time = now
+
+            return [('/face/enter', [int(count)])]
+
+        return [('/face/leave', [float(self._last_seen - self._enter_time)])]
+
+    def update(self, count, now=None):
+        """Returns the messages caused by the faces of a frame.
+
+        /face/enter carries the number of faces, /face/leave the seconds from
+        the enter event to the last frame with a face. /face/present [0 or 1]
+        follows on the first frame, with every event and once the keepalive
+        has elapsed.
+
+        Args:
+            count (int): number of faces on the frame
+            now (float): current time in seconds, time.monotonic() if None
+        Returns:
+            list of (address, args) tuples, empty while there is nothing to send
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        messages = self._events(count, now)
+
+        if messages or self._last_state is None or (self.keepalive > 0 and
+                                                    now - self._last_state >= self.keepalive):
+            self._last_state = now
+            messages.append(('/face/present', [int(self._present)]))
+
+        return messages
+
+
+class OSCSender(object):
+    """Send (address, args) messages as one OSCBundle per frame or as separate messages"""
+
+    def __init__(self, address, port, bundle=True):
+        """Open the client socket.
+
+        Args:
+            address (str): ip address of the OSC server
+            port (int): port of the OSC server
+            bundle (bool): pack all messages of a send() call into a single datagram
+        """
+
+        self.bundle = bundle
+        self._client = osc.OSCClient(address, port)
+
+    def send(self, messages):
+        """Send the messages of one frame.
+
+        Args:
+            messages: list of (address, args) tuples, args must be python int, float or str values
+        """
+
+        if not messages:
+            return
+
+        if self.bundle:
+            self._client.send(osc.OSCBundle(messages=[osc.OSCMessage(address, args) for address, args in messages]))
+        else:
+            for address, args in messages:
+                self._client.send(osc.OSCMessage(address, args))
+
+    def close(self):
+        """Close the client socket"""
+
+        self._client.close()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.pacing
+    ~~~~~~~~~~~~~~~~~
+
+    Frame pacing and shutdown handling for the main loop
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import time
+import signal
+
+__all__ = [
+    'FramePacer',
+    'GracefulShutdown'
+    ]
+
+
+class FramePacer(object):
+    """Pace a loop to a target frame rate without a GUI event loop"""
+
+    def __init__(self, fps=0.0):
+        """Create the pacer.
+
+        Args:
+            fps (float): target iterations per second, 0 runs unthrottled
+        """
+
+        self.fps = fps
+        self._deadline = None
+
+    def wait(self):
+        """Sleep until the next frame is due.
+
+        A loop which falls behind by more than one frame starts a new
+        schedule instead of running a burst of frames to catch up.
+
+        Returns:
+            seconds slept
+        """
+
+        if self.fps <= 0:
+            self._deadline = None
+
+            return 0.0
+
+        period = 1.0 / self.fps
+        now = time.perf_counter()
+
+        if self._deadline is None or now - self._deadline > period:
+            self._deadline = now + period
+
+            return 0.0
+
+        delay = self._deadline - now
+        self._deadline += period
+
+        if delay > 0:
+            time.sleep(delay)
+
+            return delay
+
+        return 0.0
+
+
+class GracefulShutdown(object):
+    """Turn SIGINT and SIGTERM into a flag checked by the main loop"""
+
+    def __init__(self):
+        """Create the flag, call install() to catch the signals"""
+
+        self._requested = False
+
+    @property
+    def requested(self):
+        """Returns True once a shutdown signal was received"""
+
+        return self._requested
+
+    def request(self, *args):
+        """Request shutdown, used as the signal handler"""
+
+        self._requested = True
+
+    def install(self):
+        """Install the signal handlers, must be called from the main thread"""
+
+        signal.signal(signal.SIGINT, self.request)
+        signal.signal(signal.SIGTERM, self.request)
+
+        if hasattr(signal, 'SIGBREAK'):
+            # Ctrl+Break on Windows consoles
+            signal.signal(signal.SIGBREAK, self.request)
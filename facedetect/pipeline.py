@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.pipeline
+    ~~~~~~~~~~~~~~~~~~~
+
+    Capture, detection and OSC messages of one source
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import time
+import collections
+
+import numpy as np
+import cv2
+
+from .capture import LatestFrameCapture, luma_view, request_luma
+from .detect import RoiDetector, TiledDetector, create_detector
+from .tracking import DetectThenTrack, CentroidTracker
+from .motion import MotionGate, ForegroundDetector
+from .pool import DetectorPool
+from .snapshot import SnapshotWriter
+from .pacing import FramePacer
+from .quality import QualityController
+from .output import DeltaFilter, PresenceTracker, face_messages, face_id_messages
+from .smoothing import OneEuroFilter
+from .sources import open_source, is_camera
+from .stats import StageTimer, NullTimer
+
+__all__ = [
+    'FacePipeline'
+    ]
+
+
+class FacePipeline(object):
+    """Capture, detect and describe the faces of one source.
+
+    Everything is set up once in the constructor; step() does the work of
+    one frame and hands its (address, args) messages to `send`, so the
+    pipeline can be imported, benchmarked and run once per camera:
+
+        pipeline = FacePipeline(parse_args(["--source", "synthetic", "--headless"]), print)
+        while pipeline.step():
+            pass
+        pipeline.close()
+    """
+
+    def __init__(self, args, send, source=None, name=None):
+        """Open the source and load the detector.
+
+        Args:
+            args: options returned by parse_args() of FaceDetectSendOSC.py
+            send: function called with the list of (address, args) messages of every frame
+            source (str): source specification, see open_source(), the first of args.source if None
+            name (str): preview window title and prefix of the summary, None for a single source
+        Raises:
+            IOError if the source or the detector model could not be opened
+        """
+
+        self.args = args
+        self.send = send
+        self.name = name
+
+        spec = args.source[0] if source is None else source
+        source = open_source(spec)
+        self.luma_size = None
+        if args.luma and not is_camera(spec):
+            self._print("--luma needs a camera, using cvtColor")
+        elif args.luma:
+            # raw YUYV frames, the Y plane is the gray image
+            self.luma_size = request_luma(source)
+            if self.luma_size is None:
+                self._print("The camera does not deliver raw YUYV frames, using cvtColor")
+        if is_camera(spec):
+            # grab frames on a background thread, keep only the newest
+            self.cap = LatestFrameCapture(source)
+            self.source_fps = 0
+        else:
+            # every frame in order, for benchmarks and tests
+            self.cap = source
+            self.source_fps = source.get(cv2.CAP_PROP_FPS)
+        replay_fps = self.source_fps if args.replay == "native" else 0
+
+        self.face_detector = create_detector(args.detector, args.model, args.config, 1.3, args.min_neighbors,
+                                             detect_scale=args.detect_scale, confidence=args.confidence,
+                                             min_score=args.min_score)
+        face_search = self.face_detector
+        self.face_tiles = None
+        if args.tiles:
+            # one detector per thread
+            factory = lambda: create_detector(args.detector, args.model, args.config, 1.3, args.min_neighbors,
+                                              confidence=args.confidence, min_score=args.min_score)
+            face_search = self.face_tiles = TiledDetector(factory, args.min_face)
+        self.face_search = None
+        if args.foreground:
+            face_search = self.face_search = ForegroundDetector(face_search)
+        self.face_roi = RoiDetector(face_search, args.roi_padding, args.full_scan_interval)
+        self.face_tracker = DetectThenTrack(self.face_roi, args.detect_interval, args.track_threshold)
+        self.face_gate = None
+        self.detector = self.face_tracker
+        if args.motion_gate > 0:
+            self.detector = self.face_gate = MotionGate(self.face_tracker, args.motion_gate)
+        self.face_ids = CentroidTracker(args.max_distance)
+        self.face_smoother = OneEuroFilter(args.min_cutoff, args.beta, args.d_cutoff)
+        self.delta = DeltaFilter(args.delta_threshold, args.heartbeat)
+        self.presence = PresenceTracker(args.enter_time, args.leave_time, args.heartbeat)
+
+        self.quality = None
+        if args.latency_budget > 0:
+            self.quality = QualityController(args.latency_budget)
+            self.quality.apply(self.face_detector, self.face_tracker)
+
+        # created on the first frame, it needs the frame shape
+        self.face_pool = None
+        # copy of the one pooled frame offered as snapshot once its faces are known
+        self.pool_image = None
+        self.pool_image_seq = None
+        # capture times of the pooled frames, results come back in the same order
+        self.pool_times = collections.deque()
+        self.snapshot_writer = None
+        if args.snapshot:
+            self.snapshot_writer = SnapshotWriter(args.snapshot, args.snapshot_rate, args.snapshot_faces_only)
+
+        self.timer = StageTimer(args.stats, path=args.stats_file) if args.stats > 0 else NullTimer()
+        self.pacer = FramePacer(args.fps or replay_fps)
+
+        # frame buffers reused by every frame
+        self.img = None
+        self.gray = None
+        self.shape = None
+        self.frame_count = 0
+        self.start_time = None
+
+    def _print(self, *values):
+        """Print a line of the summary, prefixed with the name of the pipeline"""
+
+        if self.name:
+            print("%s:" % self.name, *values)
+        else:
+            print(*values)
+
+    def _pooled_image(self, seq):
+        """Returns the copy of pooled frame seq, None if it was not kept for a snapshot"""
+
+        if seq != self.pool_image_seq:
+            return None
+
+        self.pool_image_seq = None
+
+        return self.pool_image
+
+    def finish(self, img, faces, scores, timestamp=None):
+        """Send the faces of a detected frame and offer the frame as snapshot.
+
+        Args:
+            img: the frame the faces were found on, None skips the snapshot
+            faces: array of (x, y, w, h) boxes
+            scores: detector confidence of every face
+            timestamp (float): capture time of the frame in seconds, time.monotonic() if None
+        """
+
+        args = self.args
+
+        if args.track_ids or args.smooth:
+            ids = self.face_ids.update(faces)
+        if args.smooth:
+            # all faces filtered at once
+            faces = np.rint(self.face_smoother(ids, faces, timestamp)).astype(np.int32)
+        has_faces = int(len(faces) > 0)
+
+        if args.output == "presence":
+            # events when somebody comes or goes, the state repeated every --heartbeat seconds
+            messages = self.presence.update(len(faces))
+        elif args.track_ids:
+            messages = face_id_messages(ids, faces, self.shape, args.normalize, scores if args.scores else None)
+        elif args.output == "bundle":
+            messages = face_messages(faces, self.shape, args.normalize, scores if args.scores else None)
+        else:
+            # osc arguments must be python ints or floats
+            messages = [("/FaceisDetected", [has_faces]),
+                        ("/FPosX", [int(faces[-1][0]) if len(faces) else 0])]
+
+        if args.delta and args.output != "presence":
+            # presence messages are already sent only on changes and keepalives
+            messages = self.delta.filter(messages)
+        self.timer.mark("post")
+
+        self.send(messages)
+        self.timer.mark("send")
+
+        if self.snapshot_writer is not None and img is not None:
+            # with the faces of this frame, encoded and written in the background
+            self.snapshot_writer.submit(img, has_faces)
+
+    def step(self):
+        """Process one frame.
+
+        Returns:
+            False when the source is exhausted or ESC was pressed in the preview window
+        """
+
+        args = self.args
+        timer = self.timer
+
+        timer.start()
+        # read into the same buffer every frame
+        ret, img = self.cap.read(image=self.img)
+        if not ret:
+            return False
+        self.img = img
+        if self.source_fps > 0:
+            # position in the file, frames may be processed faster or slower than they were recorded
+            timestamp = self.frame_count / self.source_fps
+        else:
+            timestamp = time.monotonic()
+        timer.mark("read")
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        self.frame_count += 1
+        frame_start = time.perf_counter()
+        if self.luma_size is not None:
+            # view of the Y plane, no conversion
+            gray = img = luma_view(img, self.luma_size)
+        else:
+            gray = self.gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        timer.mark("cvtColor")
+        # the dnn detector uses the color image
+        frame = img if self.face_detector.color else gray
+        self.shape = gray.shape
+        if args.workers > 1:
+            if self.face_pool is None:
+                self.face_pool = DetectorPool(args.workers, frame.shape, args.detector, args.model, args.config, 1.3,
+                                              args.min_neighbors, detect_scale=args.detect_scale,
+                                              confidence=args.confidence, min_score=args.min_score)
+            seq = self.face_pool.submit(frame)
+            self.pool_times.append(timestamp)
+            if self.snapshot_writer is not None and self.pool_image_seq is None and self.snapshot_writer.due():
+                # only frames the rate limit would write are copied, into the same buffer
+                if self.pool_image is None or self.pool_image.shape != img.shape:
+                    self.pool_image = np.empty_like(img)
+                np.copyto(self.pool_image, img)
+                self.pool_image_seq = seq
+            # finished frames in capture order
+            results = self.face_pool.results()
+        else:
+            # boxes in source-resolution pixels and scores
+            results = [(None, self.detector.detect(frame))]
+        timer.mark("detect")
+
+        for seq, (faces, scores) in results:
+            if seq is None:
+                self.finish(img, faces, scores, timestamp)
+            else:
+                self.finish(self._pooled_image(seq), faces, scores, self.pool_times.popleft())
+
+        if self.quality is not None:
+            if self.quality.update((time.perf_counter() - frame_start) * 1000.0):
+                self.quality.apply(self.face_detector, self.face_tracker)
+
+        if not args.headless:
+            cv2.imshow(self.name or 'img', img)
+            k = cv2.waitKey(1) & 0xff
+            if k == 27:
+                return False
+        timer.mark("display")
+        timer.frame_done()
+
+        # keep the target frame rate
+        self.pacer.wait()
+
+        return True
+
+    def run(self, shutdown=None):
+        """Process frames until the source is exhausted, ESC is pressed or shutdown is requested.
+
+        Args:
+            shutdown: GracefulShutdown instance, None runs until the source is exhausted
+        """
+
+        while (shutdown is None or not shutdown.requested) and self.step():
+            pass
+
+    def close(self):
+        """Send the frames still being detected, print the summary and release the camera and workers"""
+
+        if self.face_pool is not None:
+            # send the frames still in the pool
+            while len(self.face_pool):
+                for seq, (faces, scores) in self.face_pool.results(block=True):
+                    self.finish(self._pooled_image(seq), faces, scores, self.pool_times.popleft())
+
+        if self.frame_count:
+            elapsed = time.perf_counter() - self.start_time
+            self._print("Processed %d frames in %.2f s (%.1f fps)" % (self.frame_count, elapsed,
+                                                                     self.frame_count / elapsed))
+        if isinstance(self.cap, LatestFrameCapture):
+            self._print("Dropped frames:", self.cap.dropped)
+        if self.face_search is not None:
+            self._print("Fraction of the frame searched: %.1f%%" % (100.0 * self.face_search.coverage))
+        if self.face_gate is not None and self.face_gate.skipped:
+            self._print("Frames without motion, detection skipped:", self.face_gate.skipped)
+        delta = self.delta
+        if delta.sent + delta.suppressed:
+            self._print("OSC messages sent: %d, saved: %d (%.0f%%)" % (
+                delta.sent, delta.suppressed, 100.0 * delta.suppressed / (delta.sent + delta.suppressed)))
+
+        self.cap.release()
+        if self.face_pool is not None:
+            self.face_pool.close()
+        if self.face_tiles is not None:
+            self.face_tiles.close()
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+        if not self.args.headless:
+            cv2.destroyAllWindows()
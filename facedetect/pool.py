@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.pool
+    ~~~~~~~~~~~~~~~
+
+    Parallel face detection in worker processes
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import queue
+import signal
+import multiprocessing
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+import numpy as np
+
+from .detect import create_detector
+
+__all__ = [
+    'DetectorPool'
+    ]
+
+
+def _worker(name, shape, tasks, results, args, kwargs):
+    """Detect faces on the ring slots named by the task queue until None is received"""
+
+    # the main process decides when to stop, terminate() must not run its SIGTERM handler
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    shm = shared_memory.SharedMemory(name=name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    detector = create_detector(*args, **kwargs)
+
+    try:
+        while True:
+            task = tasks.get()
+
+            if task is None:
+                break
+
+            seq, slot = task
+            boxes, scores = detector.detect(frames[slot])
+            results.put((seq, slot, boxes, scores))
+    finally:
+        del frames
+        shm.close()
+
+
+class DetectorPool(object):
+    """Run a detector backend in several processes.
+
+    Frames are copied into a ring of slots in shared memory, so only the
+    slot index travels through the task queue. Results are handed out in
+    the order the frames were submitted.
+    """
+
+    def __init__(self, workers, shape, *args, **kwargs):
+        """Start the worker processes.
+
+        Args:
+            workers (int): number of worker processes
+            shape (tuple): shape of the frames, (rows, cols) for grayscale or (rows, cols, 3) for BGR
+            slots (int): number of ring slots, twice the number of workers if omitted
+            *args, **kwargs: arguments of create_detector
+        Raises:
+            RuntimeError if shared memory is not available (Python < 3.8)
+        """
+
+        if shared_memory is None:
+            raise RuntimeError("DetectorPool requires Python 3.8 or newer")
+
+        slots = kwargs.pop('slots', None) or workers * 2
+        ring_shape = (slots,) + tuple(shape)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(ring_shape)))
+        self._frames = np.ndarray(ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._free = list(range(slots))
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._submitted = 0
+        self._next = 0
+        self._done = {}
+        self._processes = []
+
+        for _ in range(workers):
+            process = multiprocessing.Process(target=_worker,
+                                              args=(self._shm.name, ring_shape, self._tasks, self._results,
+                                                    args, kwargs))
+            process.daemon = True
+            process.start()
+
+            self._processes.append(process)
+
+    def __len__(self):
+        """Returns number of frames submitted but not handed out yet"""
+
+        return self._submitted - self._next
+
+    def _collect(self, block):
+        """Move one finished result from the result queue into the reorder buffer.
+
+        Returns:
+            True if a result was collected
+        """
+
+        try:
+            seq, slot, boxes, scores = self._results.get(block)
+        except queue.Empty:
+            return False
+
+        self._free.append(slot)
+        self._done[seq] = (boxes, scores)
+
+        return True
+
+    def submit(self, frame):
+        """Queue a frame for detection, blocks while all ring slots are busy.
+
+        Args:
+            frame: 8-bit frame of the pool shape
+        Returns:
+            sequence number of the frame
+        """
+
+        while not self._free:
+            self._collect(True)
+
+        slot = self._free.pop()
+        seq = self._submitted
+
+        self._frames[slot] = frame
+        self._tasks.put((seq, slot))
+        self._submitted += 1
+
+        return seq
+
+    def results(self, block=False):
+        """Returns finished results in submission order.
+
+        Args:
+            block (bool): wait until the oldest pending frame is finished
+        Returns:
+            list of (seq, (boxes, scores)) tuples
+        """
+
+        while self._collect(block and self._next not in self._done and len(self) > 0):
+            pass
+
+        ready = []
+
+        while self._next in self._done:
+            ready.append((self._next, self._done.pop(self._next)))
+            self._next += 1
+
+        return ready
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+
+        for _ in self._processes:
+            self._tasks.put(None)
+
+        for process in self._processes:
+            process.join()
+
+        del self._frames
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.quality
+    ~~~~~~~~~~~~~~~~~~
+
+    Adaptive detection quality under a latency budget
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import collections
+
+__all__ = [
+    'QualityLevel',
+    'QualityController',
+    'DEFAULT_LEVELS'
+    ]
+
+
+QualityLevel = collections.namedtuple('QualityLevel', ['detect_scale', 'detect_interval', 'min_size', 'scale_factor'])
+
+# Ordered from the best detection quality to the cheapest. min_size is in source pixels.
+DEFAULT_LEVELS = (
+    QualityLevel(1.0, 1, 30, 1.3),
+    QualityLevel(0.75, 1, 40, 1.3),
+    QualityLevel(0.5, 1, 60, 1.3),
+    QualityLevel(0.5, 2, 60, 1.4),
+    QualityLevel(0.5, 3, 80, 1.4),
+    QualityLevel(0.35, 4, 80, 1.5),
+    QualityLevel(0.25, 6, 100, 1.5),
+    )
+
+
+class QualityController(object):
+    """Pick the best quality level whose measured frame time stays within a budget.
+
+    Frame times are smoothed with an exponential moving average. The level
+    drops as soon as the average exceeds the budget and rises again only
+    after it stayed well below the budget for a while, so the controller
+    does not oscillate between two levels.
+    """
+
+    def __init__(self, budget_ms, levels=DEFAULT_LEVELS, alpha=0.1, headroom=0.6, hold=30):
+        """Create the controller at the best level.
+
+        Args:
+            budget_ms (float): frame time budget in milliseconds
+            levels (tuple): QualityLevel tuples ordered from best to cheapest
+            alpha (float): smoothing factor of the moving average
+            headroom (float): fraction of the budget the average must stay under to raise quality
+            hold (int): frames to wait after a level change before the next one
+        Raises:
+            ValueError if budget_ms or levels are invalid
+        """
+
+        if budget_ms <= 0:
+            raise ValueError("Latency budget must be positive")
+
+        if not levels:
+            raise ValueError("At least one quality level is required")
+
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.alpha = alpha
+        self.headroom = headroom
+        self.hold = hold
+
+        self._index = 0
+        self._average = None
+        self._since_change = 0
+
+    @property
+    def index(self):
+        """Returns index of the current level, 0 is the best quality"""
+
+        return self._index
+
+    @property
+    def level(self):
+        """Returns current QualityLevel"""
+
+        return self.levels[self._index]
+
+    @property
+    def average_ms(self):
+        """Returns smoothed frame time in milliseconds, None before the first update"""
+
+        return self._average
+
+    def update(self, frame_ms):
+        """Feed the time spent on a frame.
+
+        Args:
+            frame_ms (float): processing time of the last frame in milliseconds
+        Returns:
+            True if the level changed
+        """
+
+        if self._average is None:
+            self._average = frame_ms
+        else:
+            self._average += self.alpha * (frame_ms - self._average)
+
+        self._since_change += 1
+
+        if self._since_change < self.hold:
+            return False
+
+        if self._average > self.budget_ms and self._index < len(self.levels) - 1:
+            self._index += 1
+        elif self._average < self.budget_ms * self.headroom and self._index > 0:
+            self._index -= 1
+        else:
+            return False
+
+        self._since_change = 0
+
+        return True
+
+    def apply(self, detector, tracker=None):
+        """Copy the current level onto a detector and an optional detect-then-track stage.
+
+        Args:
+            detector: CascadeDetector instance
+            tracker: DetectThenTrack instance or None
+        """
+
+        level = self.level
+
+        detector.detect_scale = level.detect_scale
+        detector.min_size = (level.min_size, level.min_size)
+        detector.scale_factor = level.scale_factor
+
+        if tracker is not None:
+            tracker.interval = level.detect_interval
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.smoothing
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Jitter filtering of face coordinates
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import time
+
+import numpy as np
+
+__all__ = [
+    'OneEuroFilter'
+    ]
+
+
+def _alpha(cutoff, dt):
+    """Returns smoothing factor of a low-pass filter with the cutoff frequency in Hz"""
+
+    tau = 1.0 / (2.0 * np.pi * cutoff)
+
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter(object):
+    """One Euro filter applied to x, y, w, h of all tracked faces at once.
+
+    Slow movements are smoothed strongly to remove jitter, fast movements
+    raise the cutoff frequency so the filtered position does not lag.
+    State is kept per face id and dropped when a face was not seen for
+    max_age seconds.
+
+    See: Casiez, Roussel, Vogel. 1 Euro Filter, CHI 2012.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, max_age=1.0):
+        """Create a filter without state.
+
+        Args:
+            min_cutoff (float): cutoff frequency in Hz at rest, lower removes more jitter
+            beta (float): cutoff increase per pixel/s of speed, higher reduces lag
+            d_cutoff (float): cutoff frequency in Hz of the speed estimate
+            max_age (float): seconds after which the state of a missing face is dropped
+        """
+
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_age = max_age
+
+        self._ids = np.empty(0, dtype=np.int32)
+        self._value = np.empty((0, 4), dtype=np.float64)
+        self._speed = np.empty((0, 4), dtype=np.float64)
+        self._time = np.empty(0, dtype=np.float64)
+
+    def __call__(self, ids, boxes, timestamp=None):
+        """Filter the boxes of a frame.
+
+        Args:
+            ids: id of every box, as returned by CentroidTracker.update()
+            boxes: array of (x, y, w, h) boxes
+            timestamp (float): frame time in seconds, time.monotonic() if None
+        Returns:
+            float64 array of the filtered boxes, in the order of boxes
+        """
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        ids = np.asarray(ids, dtype=np.int32)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+        keep = timestamp - self._time <= self.max_age
+        self._ids, self._value, self._speed, self._time = \
+            self._ids[keep], self._value[keep], self._speed[keep], self._time[keep]
+
+        # row of every id in the state arrays
+        rows = np.zeros(len(ids), dtype=np.intp)
+        known = np.zeros(len(ids), dtype=bool)
+
+        if len(self._ids):
+            order = np.argsort(self._ids)
+            rows = order[np.minimum(np.searchsorted(self._ids, ids, sorter=order), len(self._ids) - 1)]
+            known = self._ids[rows] == ids
+
+        result = boxes.copy()
+
+        if known.any():
+            r = rows[known]
+            dt = np.maximum(timestamp - self._time[r], 1e-6)[:, None]
+            value = boxes[known]
+
+            a_d = _alpha(self.d_cutoff, dt)
+            speed = a_d * (value - self._value[r]) / dt + (1.0 - a_d) * self._speed[r]
+
+            a = _alpha(self.min_cutoff + self.beta * np.abs(speed), dt)
+            value = a * value + (1.0 - a) * self._value[r]
+
+            self._value[r] = value
+            self._speed[r] = speed
+            self._time[r] = timestamp
+            result[known] = value
+
+        new = ~known
+
+        if new.any():
+            self._ids = np.concatenate((self._ids, ids[new]))
+            self._value = np.vstack((self._value, boxes[new]))
+            self._speed = np.vstack((self._speed, np.zeros((int(new.sum()), 4))))
+            self._time = np.concatenate((self._time, np.full(int(new.sum()), timestamp)))
+
+        return result
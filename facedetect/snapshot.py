@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.snapshot
+    ~~~~~~~~~~~~~~~~~~~
+
+    Background snapshot writer
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import time
+import threading
+
+import cv2
+
+__all__ = [
+    'SnapshotWriter'
+    ]
+
+
+class SnapshotWriter(object):
+    """Encode and write snapshots of the camera image on a background thread.
+
+    Only the newest submitted frame waits for the writer, older ones are
+    skipped. The file is replaced atomically, so readers never see a
+    partially written image.
+    """
+
+    def __init__(self, path='1.png', max_rate=10.0, faces_only=False):
+        """Start the writer thread.
+
+        Args:
+            path (str): image file to replace, the extension selects the format
+            max_rate (float): maximum snapshots per second, 0 for no limit
+            faces_only (bool): write only frames with at least one face
+        """
+
+        self.path = path
+        self.max_rate = max_rate
+        self.faces_only = faces_only
+
+        self._ext = os.path.splitext(path)[1] or '.png'
+        self._cond = threading.Condition()
+        self._pending = None
+        self._last = None
+        self._running = True
+        self._written = 0
+        self._skipped = 0
+
+        self._thread = threading.Thread(target=self._run, name="SnapshotWriter")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def written(self):
+        """Returns number of snapshots written"""
+
+        return self._written
+
+    @property
+    def skipped(self):
+        """Returns number of submitted frames which were not written"""
+
+        return self._skipped
+
+    def due(self, now=None):
+        """Returns True if the rate limit lets a frame through.
+
+        Args:
+            now (float): current time in seconds, time.monotonic() if None
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        return not self.max_rate or self._last is None or now - self._last >= 1.0 / self.max_rate
+
+    def submit(self, img, has_faces=True):
+        """Offer a frame for writing, returns immediately.
+
+        Args:
+            img: BGR or grayscale image
+            has_faces (bool): whether a face was found on the frame
+        Returns:
+            True if the frame was accepted
+        """
+
+        now = time.monotonic()
+
+        if (self.faces_only and not has_faces) or not self.due(now):
+            self._skipped += 1
+
+            return False
+
+        with self._cond:
+            if self._pending is not None:
+                self._skipped += 1
+
+            self._pending = img.copy()
+            self._last = now
+            self._cond.notify()
+
+        return True
+
+    def _run(self):
+        """Writer thread: encode and write pending frames until closed"""
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+
+                img, self._pending = self._pending, None
+
+            if img is None:
+                break
+
+            ret, data = cv2.imencode(self._ext, img)
+
+            if not ret:
+                continue
+
+            tmp = self.path + '.tmp'
+
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(data.tobytes())
+
+                os.replace(tmp, self.path)
+            except OSError:
+                # the reader may hold the file open on Windows, try again with the next frame
+                self._skipped += 1
+
+                continue
+
+            self._written += 1
+
+    def close(self):
+        """Write the pending frame and stop the writer thread"""
+
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+        self._thread.join()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.sources
+    ~~~~~~~~~~~~~~~~~~
+
+    Frame sources: cameras, video files, image directories and synthetic frames
+
+    All sources follow the cv2.VideoCapture interface used by the pipeline:
+    read(), get(), isOpened() and release().
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+
+import numpy as np
+import cv2
+
+__all__ = [
+    'ImageSequenceSource',
+    'SyntheticSource',
+    'open_source',
+    'is_camera',
+    'draw_face'
+    ]
+
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+def draw_face(img, x, y, size):
+    """Draw a cartoon frontal face which the Haar frontal face cascade detects.
+
+    Args:
+        img: 8-bit grayscale or BGR image to draw on
+        x (int): left edge of the face
+        y (int): top edge of the face
+        size (int): face width and height in pixels
+    """
+
+    face = np.full((size, size), 90, dtype=np.uint8)
+    c = size // 2
+
+    cv2.ellipse(face, (c, c), (int(size * .38), int(size * .48)), 0, 0, 360, 200, -1)
+
+    for side in (-1, 1):
+        cv2.ellipse(face, (c + side * int(size * .16), int(size * .40)),
+                    (int(size * .09), int(size * .04)), 0, 0, 360, 40, -1)
+        cv2.line(face, (c + side * int(size * .07), int(size * .30)),
+                 (c + side * int(size * .26), int(size * .30)), 60, max(int(size * .03), 1))
+
+    cv2.line(face, (c, int(size * .45)), (c, int(size * .62)), 150, max(int(size * .04), 1))
+    cv2.ellipse(face, (c, int(size * .75)), (int(size * .15), int(size * .05)), 0, 0, 360, 70, -1)
+    face = cv2.GaussianBlur(face, (0, 0), max(size * 0.02, 0.5))
+
+    rows, cols = img.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + size, cols), min(y + size, rows)
+
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    patch = face[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    if img.ndim == 3:
+        patch = patch[:, :, None]
+
+    img[y0:y1, x0:x1] = patch
+
+
+class ImageSequenceSource(object):
+    """Read the images of a directory in name order"""
+
+    def __init__(self, path, fps=30.0, loop=False):
+        """List the images.
+
+        Args:
+            path (str): directory with the images
+            fps (float): frame rate reported for native-rate replay
+            loop (bool): start over after the last image
+        """
+
+        self._files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                             if name.lower().endswith(_IMAGE_EXTENSIONS))
+        self._fps = fps
+        self._loop = loop
+        self._index = 0
+
+    def isOpened(self):
+        """Returns True if the directory contains images"""
+
+        return len(self._files) > 0
+
+    def read(self, image=None):
+        """Returns (ret, frame) with the next image
+
+        Args:
+            image: array the image is copied into, if it has the image shape
+        """
+
+        if self._loop and self._files:
+            self._index %= len(self._files)
+
+        if self._index >= len(self._files):
+            return False, None
+
+        frame = cv2.imread(self._files[self._index])
+        self._index += 1
+
+        if frame is not None and image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            frame = image
+
+        return frame is not None, frame
+
+    def get(self, prop):
+        """Returns a capture property, only the frame rate and count are known"""
+
+        if prop == cv2.CAP_PROP_FPS:
+            return self._fps
+
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self._files)
+
+        return 0.0
+
+    def release(self):
+        """Nothing to release"""
+
+        self._files = []
+
+
+class SyntheticSource(object):
+    """Generate frames with cartoon faces moving on a deterministic path.
+
+    Useful to measure the pipeline throughput on machines without a camera.
+    """
+
+    def __init__(self, width=640, height=480, frames=300, fps=30.0, faces=1, face_size=120, seed=0):
+        """Create the generator.
+
+        Args:
+            width (int): frame width
+            height (int): frame height
+            frames (int): number of frames, 0 generates frames forever
+            fps (float): frame rate reported for native-rate replay
+            faces (int): number of faces
+            face_size (int): face size in pixels
+            seed (int): seed of the random background and face paths
+        """
+
+        rng = np.random.RandomState(seed)
+
+        self._shape = (height, width, 3)
+        self._frames = frames
+        self._fps = fps
+        self._face_size = face_size
+        self._background = cv2.GaussianBlur(rng.randint(60, 120, (height, width), dtype=np.uint8), (0, 0), 3)
+        self._gray = np.empty_like(self._background)
+        self._phase = rng.uniform(0, 2 * np.pi, (faces, 2))
+        self._speed = rng.uniform(0.02, 0.06, (faces, 2))
+        self._index = 0
+
+    def isOpened(self):
+        """Always open"""
+
+        return True
+
+    def read(self, image=None):
+        """Returns (ret, frame) with the next generated frame
+
+        Args:
+            image: array the frame is drawn into, if it has the frame shape
+        """
+
+        if self._frames and self._index >= self._frames:
+            return False, None
+
+        gray = self._gray
+        np.copyto(gray, self._background)
+        rows, cols = gray.shape
+        size = self._face_size
+        t = self._index
+
+        for phase, speed in zip(self._phase, self._speed):
+            x = int((cols - size) * (0.5 + 0.5 * np.sin(phase[0] + speed[0] * t)))
+            y = int((rows - size) * (0.5 + 0.5 * np.sin(phase[1] + speed[1] * t)))
+            draw_face(gray, x, y, size)
+
+        self._index += 1
+
+        if image is None or image.shape != self._shape:
+            image = None
+
+        return True, cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=image)
+
+    def get(self, prop):
+        """Returns a capture property, only the frame rate, count and size are known"""
+
+        if prop == cv2.CAP_PROP_FPS:
+            return self._fps
+
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self._frames
+
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._shape[1]
+
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._shape[0]
+
+        return 0.0
+
+    def release(self):
+        """Nothing to release"""
+
+        pass
+
+
+def is_camera(spec):
+    """Returns True if the source specification is a camera index"""
+
+    return str(spec).isdigit()
+
+
+def open_source(spec):
+    """Open a frame source from a command line specification.
+
+    Args:
+        spec (str): camera index such as "0", "synthetic", a directory of images or a video file
+    Returns:
+        object with the cv2.VideoCapture read(), get(), isOpened() and release() methods
+    Raises:
+        IOError if the source could not be opened
+    """
+
+    spec = str(spec)
+
+    if is_camera(spec):
+        source = cv2.VideoCapture(int(spec))
+    elif spec == 'synthetic':
+        source = SyntheticSource()
+    elif os.path.isdir(spec):
+        source = ImageSequenceSource(spec)
+    else:
+        source = cv2.VideoCapture(spec)
+
+    if not source.isOpened():
+        raise IOError("Could not open source %s" % spec)
+
+    return source
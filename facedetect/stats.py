@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.stats
+    ~~~~~~~~~~~~~~~~
+
+    Per-stage latency instrumentation
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import sys
+import json
+import time
+import collections
+
+import numpy as np
+
+__all__ = [
+    'StageTimer',
+    'NullTimer'
+    ]
+
+
+class NullTimer(object):
+    """Drop-in replacement for StageTimer when instrumentation is off"""
+
+    def start(self):
+        """Does nothing"""
+
+    def mark(self, stage):
+        """Does nothing"""
+
+    def frame_done(self):
+        """Does nothing"""
+
+    def report(self):
+        """Does nothing"""
+
+
+class StageTimer(object):
+    """Measure the time spent in every stage of the frame loop.
+
+    Call start() at the beginning of a frame, mark(stage) at the end of
+    every stage and frame_done() at the end of the frame. Each stage keeps
+    the last `window` samples in a ring buffer; p50/p95/p99 and the frame
+    rate are reported every `interval` seconds.
+    """
+
+    def __init__(self, interval=5.0, window=300, path=None, stream=None):
+        """Create the timer.
+
+        Args:
+            interval (float): seconds between reports
+            window (int): number of recent frames the percentiles are computed over
+            path (str): append every report as a JSON line to this file, None prints it
+            stream: file object reports are printed to, sys.stdout if None
+        """
+
+        self.interval = interval
+        self.window = window
+        self.path = path
+        self.stream = stream
+
+        self._samples = collections.OrderedDict()
+        self._counts = {}
+        self._last = 0
+        self._frames = 0
+        self._report_frames = 0
+        self._report_time = time.perf_counter()
+
+    def start(self):
+        """Start a new frame"""
+
+        self._last = time.perf_counter_ns()
+
+    def mark(self, stage):
+        """Record the time since the previous mark or start() as the stage duration.
+
+        Args:
+            stage (str): name of the stage which just finished
+        """
+
+        now = time.perf_counter_ns()
+        samples = self._samples.get(stage)
+
+        if samples is None:
+            samples = self._samples[stage] = np.zeros(self.window, dtype=np.int64)
+            self._counts[stage] = 0
+
+        samples[self._counts[stage] % self.window] = now - self._last
+        self._counts[stage] += 1
+        self._last = now
+
+    def frame_done(self):
+        """Finish the frame and report if the interval passed"""
+
+        self._frames += 1
+
+        if time.perf_counter() - self._report_time >= self.interval:
+            self.report()
+
+    def percentiles(self):
+        """Returns dict of stage name to (p50, p95, p99) in milliseconds"""
+
+        result = collections.OrderedDict()
+
+        for stage, samples in self._samples.items():
+            count = min(self._counts[stage], self.window)
+
+            if count:
+                result[stage] = tuple(np.percentile(samples[:count], (50, 95, 99)) / 1e6)
+
+        return result
+
+    def report(self):
+        """Print or export the percentiles and the frame rate since the last report"""
+
+        now = time.perf_counter()
+        elapsed = now - self._report_time
+        fps = (self._frames - self._report_frames) / elapsed if elapsed > 0 else 0.0
+        stages = self.percentiles()
+
+        self._report_time = now
+        self._report_frames = self._frames
+
+        if self.path:
+            record = {'time': time.time(), 'fps': fps,
+                      'stages': {stage: dict(zip(('p50', 'p95', 'p99'), values))
+                                 for stage, values in stages.items()}}
+
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+            return
+
+        stream = self.stream or sys.stdout
+        stream.write("%.1f fps  (ms p50/p95/p99)\n" % fps)
+
+        for stage, values in stages.items():
+            stream.write("  %-10s %7.2f %7.2f %7.2f\n" % ((stage,) + values))
+
+        stream.flush()
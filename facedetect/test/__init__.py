@@ -0,0 +1,8 @@
+"""
+    facedetect.test
+    ~~~~~~~~~~~~~~~
+
+    Face detection pipeline tests
+
+    :license: MIT, see LICENSE for more details.
+"""
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import unittest
+import tracemalloc
+
+import numpy as np
+import cv2
+
+from facedetect import LatestFrameCapture, SyntheticSource, CascadeDetector, luma_view, request_luma
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class FakeCapture(object):
+
+    def __init__(self, frames, interval=0.0):
+        self.frames = frames
+        self.interval = interval
+        self.count = 0
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        time.sleep(self.interval)
+
+        if self.count >= self.frames:
+            return False, None
+
+        self.count += 1
+
+        return True, self.count
+
+    def release(self):
+        self.released = True
+
+
+class TestLatestFrameCapture(unittest.TestCase):
+
+    def test_read_returns_newest_frame(self):
+        cap = LatestFrameCapture(FakeCapture(10))
+
+        # let the camera run ahead of the reader
+        time.sleep(0.2)
+
+        ret, frame = cap.read(timeout=1.0)
+
+        self.assertTrue(ret)
+        self.assertEqual(frame, 10)
+        self.assertEqual(cap.dropped, 9)
+
+        cap.release()
+
+    def test_read_never_repeats_frame(self):
+        cap = LatestFrameCapture(FakeCapture(5, interval=0.01))
+        frames = []
+
+        while True:
+            ret, frame = cap.read(timeout=1.0)
+
+            if not ret:
+                break
+
+            frames.append(frame)
+
+        self.assertEqual(frames, sorted(set(frames)))
+        self.assertEqual(len(frames) + cap.dropped, 5)
+
+        cap.release()
+
+    def test_release(self):
+        source = FakeCapture(1000, interval=0.001)
+        cap = LatestFrameCapture(source)
+        cap.release()
+
+        self.assertTrue(source.released)
+        self.assertEqual(cap.read(timeout=0.1), (False, None))
+
+    def test_read_into_buffer(self):
+        cap = LatestFrameCapture(SyntheticSource(160, 120, frames=0))
+        image = np.empty((120, 160, 3), dtype=np.uint8)
+
+        ret, frame = cap.read(timeout=1.0, image=image)
+        cap.release()
+
+        self.assertTrue(ret)
+        self.assertIs(frame, image)
+
+    def test_returned_frames_are_not_overwritten(self):
+        cap = LatestFrameCapture(SyntheticSource(160, 120, frames=0))
+
+        _, first = cap.read(timeout=1.0)
+        copy = first.copy()
+
+        for _ in range(5):
+            cap.read(timeout=1.0)
+
+        cap.release()
+
+        self.assertTrue(np.array_equal(first, copy))
+
+
+def _yuyv(bgr):
+    """Returns a packed YUYV frame of shape (rows, cols, 2) of a BGR image"""
+
+    yuv = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV)
+    raw = np.empty(bgr.shape[:2] + (2,), dtype=np.uint8)
+    raw[:, :, 0] = yuv[:, :, 0]
+    raw[:, 0::2, 1] = yuv[:, 0::2, 1]
+    raw[:, 1::2, 1] = yuv[:, 1::2, 2]
+
+    return raw
+
+
+class FakeCamera(object):
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.props = {cv2.CAP_PROP_FRAME_WIDTH: 160, cv2.CAP_PROP_FRAME_HEIGHT: 120, cv2.CAP_PROP_CONVERT_RGB: 1}
+        self.bgr = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    def set(self, prop, value):
+        self.props[prop] = value
+
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+    def read(self):
+        if self.props[cv2.CAP_PROP_CONVERT_RGB]:
+            return True, self.bgr
+
+        return True, self.raw
+
+
+class TestLuma(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.bgr = rng.randint(0, 255, (120, 160, 3)).astype(np.uint8)
+        self.y = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2YUV)[:, :, 0]
+
+    def test_packed_yuyv(self):
+        raw = _yuyv(self.bgr)
+        luma = luma_view(raw, (160, 120))
+
+        self.assertTrue(np.shares_memory(luma, raw))
+        self.assertTrue(np.array_equal(luma, self.y))
+
+    def test_flat_yuyv(self):
+        raw = _yuyv(self.bgr).reshape(1, -1)
+        luma = luma_view(raw, (160, 120))
+
+        self.assertTrue(np.shares_memory(luma, raw))
+        self.assertTrue(np.array_equal(luma, self.y))
+
+    def test_planar_i420(self):
+        raw = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2YUV_I420)
+        luma = luma_view(raw, (160, 120))
+
+        self.assertTrue(np.shares_memory(luma, raw))
+        self.assertEqual(luma.shape, (120, 160))
+
+    def test_unknown_layout(self):
+        self.assertIsNone(luma_view(self.bgr, (160, 120)))
+        self.assertIsNone(luma_view(None, (160, 120)))
+
+    def test_request_luma(self):
+        camera = FakeCamera(_yuyv(self.bgr))
+
+        self.assertEqual(request_luma(camera), (160, 120))
+        self.assertEqual(camera.props[cv2.CAP_PROP_CONVERT_RGB], 0)
+        self.assertEqual(camera.props[cv2.CAP_PROP_FOURCC], cv2.VideoWriter_fourcc(*'YUYV'))
+
+    def test_request_luma_fallback(self):
+        # the backend ignores the request and keeps delivering BGR frames
+        camera = FakeCamera(self.bgr)
+
+        self.assertIsNone(request_luma(camera))
+        self.assertEqual(camera.props[cv2.CAP_PROP_CONVERT_RGB], 1)
+
+
+class TestSteadyStateAllocations(unittest.TestCase):
+
+    def test_allocations_per_frame_stay_flat(self):
+        cap = LatestFrameCapture(SyntheticSource(320, 240, frames=0, face_size=80))
+        detector = CascadeDetector(_CASCADE, detect_scale=0.5)
+
+        def run(frames, img=None, gray=None):
+            for _ in range(frames):
+                ret, img = cap.read(timeout=1.0, image=img)
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=gray)
+                detector.detect(gray)
+
+            return img, gray
+
+        img, gray = run(10)
+
+        tracemalloc.start()
+
+        try:
+            result = run(50, img, gray)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            cap.release()
+
+        self.assertIs(result[0], img)
+        self.assertIs(result[1], gray)
+        # not a single frame-sized buffer was allocated, nothing accumulated
+        self.assertLess(peak, gray.nbytes // 2)
+        self.assertLess(current, 16 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
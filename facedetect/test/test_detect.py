@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+import cv2
+
+from facedetect import (CascadeDetector, DnnDetector, RoiDetector, TiledDetector, create_detector, rescale_boxes,
+                        pad_boxes, merge_windows, nms, tile_windows, draw_face, SyntheticSource)
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class TestRescaleBoxes(unittest.TestCase):
+
+    def test_identity(self):
+        boxes = rescale_boxes([(10, 20, 30, 40)], 1.0)
+
+        self.assertEqual(boxes.dtype, np.int32)
+        self.assertEqual(boxes.tolist(), [[10, 20, 30, 40]])
+
+    def test_downscaled(self):
+        boxes = rescale_boxes([(10, 20, 30, 41)], 0.5)
+
+        self.assertEqual(boxes.tolist(), [[20, 40, 60, 82]])
+
+    def test_empty(self):
+        self.assertEqual(rescale_boxes((), 0.5).shape, (0, 4))
+
+
+class TestWindows(unittest.TestCase):
+
+    def test_pad_boxes_clipped(self):
+        windows = pad_boxes([(10, 20, 40, 40), (600, 440, 40, 40)], 0.5, (480, 640))
+
+        self.assertEqual(windows.tolist(), [[0, 0, 70, 80], [580, 420, 640, 480]])
+
+    def test_merge_windows(self):
+        merged = merge_windows([(0, 0, 10, 10), (100, 100, 120, 120), (5, 5, 20, 20), (19, 0, 30, 3)])
+
+        self.assertEqual(sorted(merged), [(0, 0, 30, 20), (100, 100, 120, 120)])
+
+
+class TestNms(unittest.TestCase):
+
+    def test_suppresses_overlapping(self):
+        boxes = np.array([(0, 0, 10, 10), (1, 1, 10, 10), (50, 50, 10, 10)])
+        keep = nms(boxes, [0.5, 0.9, 0.7])
+
+        self.assertEqual(keep.tolist(), [1, 2])
+
+    def test_ties_prefer_larger_box(self):
+        keep = nms([(0, 0, 10, 10), (0, 0, 12, 12)], [1.0, 1.0])
+
+        self.assertEqual(keep.tolist(), [1])
+
+    def test_empty(self):
+        self.assertEqual(len(nms(np.empty((0, 4)), [])), 0)
+
+
+class TestTileWindows(unittest.TestCase):
+
+    def test_cover_frame(self):
+        windows = tile_windows((100, 250), 100, 20)
+
+        self.assertEqual(windows, [(0, 0, 100, 100), (80, 0, 180, 100), (150, 0, 250, 100)])
+
+    def test_small_frame(self):
+        self.assertEqual(tile_windows((50, 60), 100, 20), [(0, 0, 60, 50)])
+
+
+class TestTiledDetector(unittest.TestCase):
+
+    def test_small_and_large_faces(self):
+        gray = np.full((720, 1280), 100, dtype=np.uint8)
+        truth = [(100, 100, 48), (610, 390, 50), (900, 200, 200)]
+
+        for x, y, size in truth:
+            draw_face(gray, x, y, size)
+
+        tiled = TiledDetector(lambda: CascadeDetector(_CASCADE, 1.1, 5), min_face=40, threads=2)
+
+        try:
+            boxes, scores = tiled.detect(gray)
+        finally:
+            tiled.close()
+
+        self.assertEqual(len(boxes), 3)
+        self.assertEqual(len(scores), 3)
+
+        for x, y, size in truth:
+            centers = boxes[:, :2] + boxes[:, 2:] // 2
+            self.assertTrue((np.abs(centers - (x + size // 2, y + size // 2)).max(axis=1) < size // 4).any())
+
+    def test_tile_layout(self):
+        tiled = TiledDetector(mock.Mock, min_face=30, threads=1)
+        tiled.close()
+
+        self.assertEqual((tiled.tile, tiled.overlap), (240, 60))
+
+
+class TestCascadeDetector(unittest.TestCase):
+
+    @mock.patch('cv2.CascadeClassifier')
+    def test_detect_scale(self, mock_cascade_ctor):
+        mock_cascade = mock_cascade_ctor.return_value
+        mock_cascade.empty.return_value = False
+        mock_cascade.detectMultiScale3.return_value = (np.array([[100, 50, 40, 40]]), np.array([20]),
+                                                       np.array([[4.5]]))
+
+        detector = CascadeDetector('cascade.xml', 1.2, 3, min_size=(60, 60), detect_scale=0.25)
+        faces = detector.detect(np.zeros((1080, 1920), dtype=np.uint8))
+
+        gray, scale_factor, min_neighbors = mock_cascade.detectMultiScale3.call_args[0]
+
+        self.assertEqual(gray.shape, (270, 480))
+        self.assertEqual((scale_factor, min_neighbors), (1.2, 3))
+        self.assertEqual(mock_cascade.detectMultiScale3.call_args[1]['minSize'], (15, 15))
+        self.assertIsNone(mock_cascade.detectMultiScale3.call_args[1]['maxSize'])
+        self.assertTrue(mock_cascade.detectMultiScale3.call_args[1]['outputRejectLevels'])
+        self.assertEqual(faces[0].tolist(), [[400, 200, 160, 160]])
+        self.assertEqual(faces[1].tolist(), [4.5])
+
+    @mock.patch('cv2.CascadeClassifier')
+    def test_min_score(self, mock_cascade_ctor):
+        mock_cascade = mock_cascade_ctor.return_value
+        mock_cascade.empty.return_value = False
+        mock_cascade.detectMultiScale3.return_value = (np.array([[10, 10, 40, 40], [60, 10, 40, 40]]),
+                                                       np.array([20, 20]), np.array([[0.5], [6.0]]))
+
+        boxes, scores = CascadeDetector('cascade.xml', min_score=2.0).detect(np.zeros((120, 160), dtype=np.uint8))
+
+        self.assertEqual(boxes.tolist(), [[60, 10, 40, 40]])
+        self.assertEqual(scores.tolist(), [6.0])
+
+    def test_scores(self):
+        gray = cv2.cvtColor(SyntheticSource(320, 240, faces=1, seed=3).read()[1], cv2.COLOR_BGR2GRAY)
+        boxes, scores = CascadeDetector(_CASCADE, 1.1, 3).detect(gray)
+
+        self.assertEqual(len(boxes), len(scores))
+        self.assertTrue((scores > 0).all())
+
+    @mock.patch('cv2.CascadeClassifier')
+    def test_invalid_scale(self, mock_cascade_ctor):
+        mock_cascade_ctor.return_value.empty.return_value = False
+
+        self.assertRaises(ValueError, CascadeDetector, 'cascade.xml', detect_scale=0)
+        self.assertRaises(ValueError, CascadeDetector, 'cascade.xml', detect_scale=1.5)
+
+    def test_missing_cascade(self):
+        self.assertRaises(IOError, CascadeDetector, 'missing.xml')
+
+
+class TestDnnDetector(unittest.TestCase):
+
+    @mock.patch('cv2.dnn.readNet')
+    def test_detect(self, mock_read_net):
+        mock_net = mock_read_net.return_value
+        mock_net.forward.return_value = np.array([[[
+            [0, 1, 0.95, 0.25, 0.25, 0.50, 0.75],
+            [0, 1, 0.30, 0.00, 0.00, 0.10, 0.10],
+            [0, 1, 0.80, 0.90, 0.90, 1.20, 1.20],
+            ]]], dtype=np.float32)
+
+        detector = DnnDetector('model.caffemodel', 'deploy.prototxt', confidence=0.5)
+        boxes, scores = detector.detect(np.zeros((480, 640), dtype=np.uint8))
+
+        blob = mock_net.setInput.call_args[0][0]
+
+        self.assertEqual(blob.shape, (1, 3, 300, 300))
+        self.assertEqual(boxes.dtype, np.int32)
+        self.assertEqual(boxes.tolist(), [[160, 120, 160, 240], [576, 432, 64, 48]])
+        np.testing.assert_allclose(scores, [0.95, 0.8], rtol=1e-6)
+
+    @mock.patch('cv2.dnn.readNet')
+    def test_min_size(self, mock_read_net):
+        mock_read_net.return_value.forward.return_value = np.array([[[
+            [0, 1, 0.95, 0.25, 0.25, 0.50, 0.75],
+            [0, 1, 0.80, 0.90, 0.90, 1.20, 1.20],
+            ]]], dtype=np.float32)
+
+        detector = DnnDetector('model.caffemodel', 'deploy.prototxt', min_size=(100, 100))
+        boxes, scores = detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+        self.assertEqual(boxes.tolist(), [[160, 120, 160, 240]])
+        self.assertEqual(len(scores), 1)
+
+    def test_missing_model(self):
+        self.assertRaises(IOError, DnnDetector, 'missing.caffemodel', 'missing.prototxt')
+
+
+class TestCreateDetector(unittest.TestCase):
+
+    @mock.patch('cv2.CascadeClassifier')
+    def test_cascades(self, mock_cascade_ctor):
+        mock_cascade_ctor.return_value.empty.return_value = False
+
+        detector = create_detector('lbp', scale_factor=1.1, min_neighbors=3)
+
+        self.assertIsInstance(detector, CascadeDetector)
+        self.assertFalse(detector.color)
+        self.assertEqual(mock_cascade_ctor.call_args[0][0], 'lbpcascade_frontalface_improved.xml')
+
+    @mock.patch('cv2.dnn.readNet')
+    def test_dnn(self, mock_read_net):
+        detector = create_detector('dnn', confidence=0.7)
+
+        self.assertIsInstance(detector, DnnDetector)
+        self.assertTrue(detector.color)
+        self.assertEqual(detector.confidence, 0.7)
+        self.assertEqual(mock_read_net.call_args[0],
+                         ('res10_300x300_ssd_iter_140000.caffemodel', 'deploy.prototxt'))
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, create_detector, 'hog')
+
+
+class TestRoiDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.gray = np.zeros((480, 640), dtype=np.uint8)
+        self.detector = mock.Mock()
+        self.shapes = []
+
+        def detect(gray):
+            self.shapes.append(gray.shape)
+
+            if gray.shape == self.gray.shape:
+                return np.array([[200, 100, 80, 80]], dtype=np.int32), np.ones(1, dtype=np.float32)
+
+            return np.array([[40, 40, 80, 80]], dtype=np.int32), np.ones(1, dtype=np.float32)
+
+        self.detector.detect.side_effect = detect
+
+    def test_searches_around_last_face(self):
+        roi = RoiDetector(self.detector, padding=0.5, full_scan_interval=30)
+
+        self.assertEqual(roi.detect(self.gray)[0].tolist(), [[200, 100, 80, 80]])
+        self.assertEqual(roi.detect(self.gray)[0].tolist(), [[200, 100, 80, 80]])
+        self.assertEqual(self.shapes, [(480, 640), (160, 160)])
+
+    def test_full_scan_interval(self):
+        roi = RoiDetector(self.detector, padding=0.5, full_scan_interval=3)
+
+        for _ in range(6):
+            roi.detect(self.gray)
+
+        self.assertEqual(self.shapes.count((480, 640)), 2)
+
+    def test_full_scan_when_lost(self):
+        roi = RoiDetector(self.detector, padding=0.5)
+        roi.detect(self.gray)
+
+        self.detector.detect.side_effect = None
+        self.detector.detect.return_value = (np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32))
+        roi.detect(self.gray)
+
+        self.assertEqual(self.detector.detect.call_args[0][0].shape, (480, 640))
+
+    def test_disabled(self):
+        roi = RoiDetector(self.detector, padding=0)
+
+        for _ in range(3):
+            roi.detect(self.gray)
+
+        self.assertEqual(self.shapes, [(480, 640)] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
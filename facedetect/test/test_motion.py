@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+import cv2
+
+from facedetect import MotionGate, ForegroundDetector, CascadeDetector, SyntheticSource
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+def _frame(x, shape=(240, 320)):
+    """Returns a frame with a bright square at column x"""
+
+    frame = np.full(shape, 60, dtype=np.uint8)
+    frame[80:160, x:x + 80] = 220
+
+    return frame
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = mock.Mock()
+        self.detector.detect.return_value = (np.array([[10, 20, 30, 30]], dtype=np.int32),
+                                             np.array([1.0], dtype=np.float32))
+
+    def test_static_scene_skips_detection(self):
+        gate = MotionGate(self.detector)
+
+        for _ in range(10):
+            boxes, scores = gate.detect(_frame(100))
+
+        self.assertEqual(self.detector.detect.call_count, 1)
+        self.assertEqual(gate.skipped, 9)
+        self.assertEqual(boxes.tolist(), [[10, 20, 30, 30]])
+        self.assertEqual(scores.tolist(), [1.0])
+
+    def test_motion_runs_detector(self):
+        gate = MotionGate(self.detector)
+        gate.detect(_frame(100))
+        gate.detect(_frame(140))
+
+        self.assertEqual(self.detector.detect.call_count, 2)
+
+    def test_slow_motion_accumulates(self):
+        gate = MotionGate(self.detector, threshold=0.02)
+
+        # 40 steps of one pixel, each too small to count as motion on its own
+        for x in range(100, 140):
+            gate.detect(_frame(x))
+
+        self.assertGreater(self.detector.detect.call_count, 1)
+        self.assertLess(self.detector.detect.call_count, 20)
+
+    def test_sensor_noise_ignored(self):
+        gate = MotionGate(self.detector)
+        rng = np.random.RandomState(1)
+
+        for _ in range(10):
+            noise = rng.randint(-10, 11, (240, 320))
+            gate.detect(np.clip(_frame(100) + noise, 0, 255).astype(np.uint8))
+
+        self.assertEqual(self.detector.detect.call_count, 1)
+
+    def test_refresh_interval(self):
+        gate = MotionGate(self.detector, refresh_interval=4)
+
+        for _ in range(8):
+            gate.detect(_frame(100))
+
+        self.assertEqual(self.detector.detect.call_count, 2)
+
+    def test_color_frames(self):
+        gate = MotionGate(self.detector)
+        frame = np.dstack([_frame(100)] * 3)
+
+        gate.detect(frame)
+        gate.detect(frame)
+
+        self.assertEqual(self.detector.detect.call_count, 1)
+        self.assertEqual(self.detector.detect.call_args[0][0].shape, (240, 320, 3))
+
+
+class TestForegroundDetector(unittest.TestCase):
+
+    def test_regions_follow_moving_square(self):
+        foreground = ForegroundDetector(mock.Mock())
+
+        for x in range(0, 100, 10):
+            foreground.regions(_frame(x))
+
+        regions = foreground.regions(_frame(200))
+
+        self.assertEqual(len(regions), 1)
+        x, y, w, h = regions[0]
+        self.assertTrue(x <= 200 and x + w >= 280 and y <= 80 and y + h >= 160)
+
+    def test_searches_only_foreground(self):
+        detector = mock.Mock()
+        detector.detect.return_value = (np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32))
+        foreground = ForegroundDetector(detector, full_scan_interval=100)
+
+        for x in range(0, 200, 10):
+            foreground.detect(_frame(x))
+
+        # one full scan, then only windows around the square
+        shapes = [call[0][0].shape for call in detector.detect.call_args_list]
+        self.assertEqual(shapes.count((240, 320)), 1)
+        self.assertLess(foreground.coverage, 0.6)
+
+    def test_finds_faces(self):
+        source = SyntheticSource(960, 540, frames=40, face_size=90)
+        foreground = ForegroundDetector(CascadeDetector(_CASCADE))
+        found = 0
+
+        for _ in range(40):
+            _, frame = source.read()
+            boxes, scores = foreground.detect(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            found += len(boxes)
+
+        self.assertEqual(found, 40)
+        self.assertLess(foreground.coverage, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
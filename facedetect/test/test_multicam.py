@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import signal
+import shutil
+import tempfile
+import unittest
+import threading
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+import cv2
+
+from facedetect import CameraProcesses, GracefulShutdown, run_camera, camera_snapshot, draw_face
+
+from FaceDetectSendOSC import parse_args
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+def _args(*options):
+    """Returns the options of a headless run without snapshots"""
+
+    return parse_args(['--headless', '--snapshot', '', '--model', _CASCADE] + list(options))
+
+
+def _image_dir(frames, faces):
+    """Returns a temporary directory with frames images, the first faces of them show a face"""
+
+    path = tempfile.mkdtemp()
+
+    for i in range(frames):
+        img = np.full((240, 320, 3), 100, dtype=np.uint8)
+
+        if i < faces:
+            draw_face(img, 100, 60, 120)
+
+        cv2.imwrite(os.path.join(path, 'frame%03d.png' % i), img)
+
+    return path
+
+
+class TestRunCamera(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = _image_dir(3, 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_messages(self):
+        sent = []
+        frames = run_camera(self.dir, sent.append, threading.Event(), _args())
+
+        self.assertEqual(frames, 3)
+        self.assertEqual([dict(messages)['/FaceisDetected'] for messages in sent], [[1], [1], [0]])
+
+    def test_bundle_and_delta(self):
+        sent = []
+        run_camera(self.dir, sent.append, threading.Event(), _args('--output', 'bundle', '--delta', '--heartbeat', '0'))
+
+        self.assertEqual(sent[0][0], ('/face/count', [1]))
+        # the face did not move on the second frame
+        self.assertEqual(sent[1], [])
+        self.assertEqual(sent[2], [('/face/count', [0])])
+
+    def test_stop(self):
+        stop = threading.Event()
+        stop.set()
+
+        self.assertEqual(run_camera(self.dir, [].append, stop, _args()), 0)
+
+    def test_camera_snapshot(self):
+        self.assertEqual(camera_snapshot('1.png', 2), '1_cam2.png')
+        self.assertEqual(camera_snapshot(os.path.join('out', 'face.jpg'), 0), os.path.join('out', 'face_cam0.jpg'))
+
+
+class TestCameraProcesses(unittest.TestCase):
+
+    def setUp(self):
+        self.dirs = [_image_dir(4, 4), _image_dir(2, 0)]
+
+    def tearDown(self):
+        for path in self.dirs:
+            shutil.rmtree(path)
+
+    def test_namespaces(self):
+        cameras = CameraProcesses(self.dirs, _args('--output', 'bundle'))
+        results = []
+
+        while cameras.running:
+            results.extend(cameras.results(timeout=5.0))
+
+        cameras.close()
+
+        self.assertEqual(cameras.frames, [4, 2])
+        self.assertEqual(sorted(set((cam, messages[0][0], messages[0][1][0]) for cam, messages in results)),
+                         [(0, '/cam/0/face/count', 1), (1, '/cam/1/face/count', 0)])
+        self.assertTrue(all(address.startswith('/cam/%d/' % cam) for cam, messages in results
+                            for address, _ in messages))
+
+
+    def test_pipeline_options(self):
+        # every camera runs the whole pipeline, snapshots included
+        snapshot = os.path.join(self.dirs[0], 'snapshot.png')
+        cameras = CameraProcesses(self.dirs, _args('--snapshot', snapshot, '--tiles', '--min-face', '30'))
+
+        while cameras.running:
+            cameras.results(timeout=5.0)
+
+        cameras.close()
+
+        self.assertEqual(cameras.frames, [4, 2])
+        self.assertTrue(os.path.exists(camera_snapshot(snapshot, 0)))
+        self.assertTrue(os.path.exists(camera_snapshot(snapshot, 1)))
+
+    @mock.patch('facedetect.multicam.run_camera', lambda *args, **kwargs: time.sleep(30))
+    def test_close_terminates_stuck_camera(self):
+        # the processes inherit the shutdown handler of the main process
+        previous = signal.getsignal(signal.SIGINT), signal.getsignal(signal.SIGTERM)
+        GracefulShutdown().install()
+
+        try:
+            cameras = CameraProcesses(self.dirs[:1], _args())
+            start = time.monotonic()
+            cameras.close(timeout=0.5)
+        finally:
+            signal.signal(signal.SIGINT, previous[0])
+            signal.signal(signal.SIGTERM, previous[1])
+
+        self.assertLess(time.monotonic() - start, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+
+import osc
+from facedetect import OSCSender, DeltaFilter, PresenceTracker, face_messages, face_id_messages, namespace_messages
+
+
+class TestFaceMessages(unittest.TestCase):
+
+    def test_pixels(self):
+        faces = np.array([[10, 20, 30, 40], [50, 60, 70, 80]], dtype=np.int32)
+        messages = face_messages(faces)
+
+        self.assertEqual(messages, [('/face/count', [2]),
+                                    ('/face/0', [10, 20, 30, 40]),
+                                    ('/face/1', [50, 60, 70, 80])])
+        self.assertIs(type(messages[1][1][0]), int)
+
+    def test_normalized(self):
+        messages = face_messages([(160, 120, 64, 48)], (480, 640), normalize=True)
+
+        self.assertEqual(messages[1], ('/face/0', [0.25, 0.25, 0.1, 0.1]))
+
+    def test_no_faces(self):
+        self.assertEqual(face_messages(np.empty((0, 4))), [('/face/count', [0])])
+
+    def test_scores(self):
+        messages = face_messages([(10, 20, 30, 40)], scores=np.array([2.5], dtype=np.float32))
+
+        self.assertEqual(messages[2], ('/face/0/score', [2.5]))
+        self.assertIs(type(messages[2][1][0]), float)
+
+
+class TestFaceIdMessages(unittest.TestCase):
+
+    def test_addresses(self):
+        messages = face_id_messages([7], [(10, 20, 30, 40)])
+
+        self.assertEqual(messages, [('/face/count', [1]),
+                                    ('/face/ids', [7]),
+                                    ('/face/7/x', [10]),
+                                    ('/face/7/y', [20]),
+                                    ('/face/7/w', [30]),
+                                    ('/face/7/h', [40])])
+
+    def test_scores(self):
+        messages = face_id_messages([7, 3], [(10, 20, 30, 40), (50, 60, 70, 80)], scores=[0.5, 0.75])
+
+        self.assertIn(('/face/7/score', [0.5]), messages)
+        self.assertIn(('/face/3/score', [0.75]), messages)
+
+
+class TestNamespaceMessages(unittest.TestCase):
+
+    def test_prefix(self):
+        messages = namespace_messages([('/face/count', [1]), ('/face/0', [1, 2, 3, 4])], '/cam/2')
+
+        self.assertEqual(messages, [('/cam/2/face/count', [1]), ('/cam/2/face/0', [1, 2, 3, 4])])
+
+
+class TestDeltaFilter(unittest.TestCase):
+
+    def test_unchanged_suppressed(self):
+        delta = DeltaFilter(heartbeat=1.0)
+        messages = [('/face/count', [1]), ('/face/0', [10, 20, 30, 40])]
+
+        self.assertEqual(delta.filter(messages, 0.0), messages)
+        self.assertEqual(delta.filter(messages, 0.1), [])
+        self.assertEqual(delta.filter([('/face/count', [1]), ('/face/0', [11, 20, 30, 40])], 0.2),
+                         [('/face/0', [11, 20, 30, 40])])
+        self.assertEqual((delta.sent, delta.suppressed), (3, 3))
+
+    def test_threshold(self):
+        delta = DeltaFilter(threshold=2, heartbeat=0)
+        delta.filter([('/FPosX', [100])], 0.0)
+
+        self.assertEqual(delta.filter([('/FPosX', [102])], 0.1), [])
+        # compared against the last sent value, so slow drift is sent eventually
+        self.assertEqual(delta.filter([('/FPosX', [103])], 0.2), [('/FPosX', [103])])
+
+    def test_threshold_only_on_coordinates(self):
+        delta = DeltaFilter(threshold=5, heartbeat=0)
+        delta.filter([('/FaceisDetected', [0]), ('/face/count', [2]), ('/face/ids', [4, 5]),
+                      ('/face/4/x', [100])], 0.0)
+
+        self.assertEqual(delta.filter([('/FaceisDetected', [1]), ('/face/count', [4]), ('/face/ids', [4, 6]),
+                                       ('/face/4/x', [103])], 0.1),
+                         [('/FaceisDetected', [1]), ('/face/count', [4]), ('/face/ids', [4, 6])])
+
+    def test_forgets_missing_addresses(self):
+        delta = DeltaFilter(heartbeat=0)
+        delta.filter([('/face/ids', [1]), ('/face/1/x', [10])], 0.0)
+        delta.filter([('/face/ids', [2]), ('/face/2/x', [20])], 0.1)
+
+        self.assertEqual(sorted(delta._last), ['/face/2/x', '/face/ids'])
+        # a face which comes back is sent again
+        self.assertEqual(delta.filter([('/face/ids', [2]), ('/face/2/x', [20]), ('/face/1/x', [10])], 0.2),
+                         [('/face/1/x', [10])])
+
+    def test_heartbeat(self):
+        delta = DeltaFilter(heartbeat=1.0)
+        messages = [('/FaceisDetected', [0])]
+        delta.filter(messages, 0.0)
+
+        self.assertEqual(delta.filter(messages, 0.5), [])
+        self.assertEqual(delta.filter(messages, 1.0), messages)
+
+    def test_length_change(self):
+        delta = DeltaFilter()
+        delta.filter([('/face/ids', [1, 2])], 0.0)
+
+        self.assertEqual(delta.filter([('/face/ids', [1])], 0.1), [('/face/ids', [1])])
+
+
+class TestPresenceTracker(unittest.TestCase):
+
+    def test_enter_leave(self):
+        presence = PresenceTracker(enter_time=0.2, leave_time=1.0, keepalive=0)
+
+        self.assertEqual(presence.update(1, 0.0), [('/face/present', [0])])
+        self.assertEqual(presence.update(2, 0.2), [('/face/enter', [2]), ('/face/present', [1])])
+        self.assertTrue(presence.present)
+        self.assertEqual(presence.update(1, 0.5), [])
+        self.assertEqual(presence.update(0, 3.0), [])
+        messages = presence.update(0, 4.0)
+
+        # duration from the enter event to the last frame with a face
+        self.assertEqual(messages[0][0], '/face/leave')
+        self.assertAlmostEqual(messages[0][1][0], 0.3)
+        self.assertEqual(messages[1], ('/face/present', [0]))
+        self.assertFalse(presence.present)
+
+    def test_flicker_ignored(self):
+        presence = PresenceTracker(enter_time=0.2, leave_time=1.0, keepalive=0)
+        presence.update(1, 0.0)
+        presence.update(1, 0.2)
+
+        # single missed detections do not end the presence
+        for now in np.arange(0.3, 5.0, 0.1):
+            self.assertEqual(presence.update(int(round(now * 10)) % 3, now), [])
+
+        self.assertAlmostEqual(presence.duration(5.0), 4.8)
+
+    def test_keepalive(self):
+        presence = PresenceTracker(enter_time=0.2, keepalive=1.0)
+
+        self.assertEqual(presence.update(0, 0.0), [('/face/present', [0])])
+        self.assertEqual(presence.update(0, 0.5), [])
+        self.assertEqual(presence.update(0, 1.0), [('/face/present', [0])])
+        presence.update(1, 1.25)
+        # the state follows the event at once and restarts the keepalive
+        self.assertEqual(presence.update(1, 1.5), [('/face/enter', [1]), ('/face/present', [1])])
+        self.assertEqual(presence.update(1, 2.25), [])
+        self.assertEqual(presence.update(1, 2.5), [('/face/present', [1])])
+
+    def test_false_face_ignored(self):
+        presence = PresenceTracker(enter_time=0.2, keepalive=0)
+
+        self.assertEqual(presence.update(1, 0.0), [('/face/present', [0])])
+        self.assertEqual(presence.update(0, 0.1), [])
+        self.assertEqual(presence.update(1, 0.2), [])
+        self.assertFalse(presence.present)
+        self.assertEqual(presence.duration(0.2), 0.0)
+
+
+class TestOSCSender(unittest.TestCase):
+
+    @mock.patch('socket.socket')
+    def test_bundle(self, mock_socket_ctor):
+        mock_socket = mock_socket_ctor.return_value
+
+        sender = OSCSender('127.0.0.1', 31337)
+        sender.send(face_messages([(10, 20, 30, 40)]))
+
+        self.assertEqual(mock_socket.sendto.call_count, 1)
+
+        dgram, address = mock_socket.sendto.call_args[0]
+        bundle = osc.OSCBundle.parse(dgram)
+
+        self.assertEqual(address, ('127.0.0.1', 31337))
+        self.assertEqual(len(bundle), 2)
+        self.assertEqual([msg.address for msg in bundle], ['/face/count', '/face/0'])
+        self.assertEqual(bundle[1].args, [10, 20, 30, 40])
+
+    @mock.patch('socket.socket')
+    def test_messages(self, mock_socket_ctor):
+        mock_socket = mock_socket_ctor.return_value
+
+        sender = OSCSender('127.0.0.1', 31337, bundle=False)
+        sender.send(face_messages([(10, 20, 30, 40)]))
+
+        self.assertEqual(mock_socket.sendto.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import signal
+import unittest
+
+from facedetect import FramePacer, GracefulShutdown
+
+
+class TestFramePacer(unittest.TestCase):
+
+    def test_target_fps(self):
+        pacer = FramePacer(50)
+        start = time.perf_counter()
+
+        for _ in range(11):
+            pacer.wait()
+
+        self.assertAlmostEqual(time.perf_counter() - start, 0.2, delta=0.05)
+
+    def test_unthrottled(self):
+        pacer = FramePacer(0)
+        start = time.perf_counter()
+
+        for _ in range(100):
+            self.assertEqual(pacer.wait(), 0.0)
+
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_no_burst_after_stall(self):
+        pacer = FramePacer(100)
+        pacer.wait()
+        time.sleep(0.1)
+
+        self.assertEqual(pacer.wait(), 0.0)
+        self.assertGreater(pacer.wait(), 0.0)
+
+
+@unittest.skipUnless(hasattr(signal, 'SIGUSR1') and hasattr(os, 'kill'), "POSIX signals required")
+class TestGracefulShutdown(unittest.TestCase):
+
+    def setUp(self):
+        self.handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    def tearDown(self):
+        for sig, handler in self.handlers.items():
+            signal.signal(sig, handler)
+
+    def test_sigterm(self):
+        shutdown = GracefulShutdown()
+        shutdown.install()
+
+        self.assertFalse(shutdown.requested)
+
+        os.kill(os.getpid(), signal.SIGTERM)
+
+        self.assertTrue(shutdown.requested)
+
+
+if __name__ == "__main__":
+    unittest.main()
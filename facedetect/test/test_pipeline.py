@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+
+from facedetect import FacePipeline, draw_face
+
+from FaceDetectSendOSC import create_sender, parse_args
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class TestFacePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+        for i in range(3):
+            img = np.full((240, 320, 3), 100, dtype=np.uint8)
+            draw_face(img, 100, 60, 120)
+            cv2.imwrite(os.path.join(self.dir, 'frame%03d.png' % i), img)
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(1.0)
+        self.close_sender = None
+
+    def tearDown(self):
+        if self.close_sender is not None:
+            self.close_sender()
+        self.server.close()
+        shutil.rmtree(self.dir)
+
+    def _pipeline(self, *options):
+        args = parse_args(['--source', self.dir, '--headless', '--snapshot', '', '--model', _CASCADE,
+                           '--ip', '127.0.0.1', '--port', str(self.server.getsockname()[1])] + list(options))
+        send, self.close_sender = create_sender(args)
+
+        return FacePipeline(args, send)
+
+    def test_steps_until_exhausted(self):
+        pipeline = self._pipeline()
+
+        self.assertEqual([pipeline.step() for _ in range(4)], [True, True, True, False])
+        self.assertEqual(pipeline.frame_count, 3)
+
+        # /FaceisDetected and /FPosX for every frame
+        datagrams = [self.server.recv(1024) for _ in range(6)]
+        self.assertTrue(datagrams[0].startswith(b'/FaceisDetected'))
+
+        pipeline.close()
+
+    def test_bundle(self):
+        pipeline = self._pipeline('--output', 'bundle')
+        pipeline.run()
+        pipeline.close()
+
+        self.assertTrue(self.server.recv(1024).startswith(b'#bundle'))
+
+    def test_workers_send_every_frame(self):
+        pipeline = self._pipeline('--output', 'bundle', '--workers', '2', '--snapshot', os.path.join(self.dir, 's.png'),
+                                  '--snapshot-faces-only')
+        pipeline.run()
+        pipeline.close()
+
+        # frames still in the pool are sent on close
+        datagrams = [self.server.recv(4096) for _ in range(3)]
+        self.assertTrue(all(d.startswith(b'#bundle') for d in datagrams))
+        self.assertEqual(pipeline.snapshot_writer.written, 1)
+        self.assertIsNone(pipeline.pool_image_seq)
+
+    def test_smoothing_uses_capture_time(self):
+        pipeline = self._pipeline('--smooth', '--workers', '2')
+        smoother = pipeline.face_smoother
+        timestamps = []
+
+        def record(ids, boxes, timestamp=None):
+            timestamps.append(timestamp)
+            return smoother(ids, boxes, timestamp)
+
+        pipeline.face_smoother = record
+        pipeline.run()
+        pipeline.close()
+
+        # pooled results finishing in the same step keep the times of their frames
+        fps = pipeline.cap.get(cv2.CAP_PROP_FPS)
+        np.testing.assert_allclose(timestamps, [0.0, 1.0 / fps, 2.0 / fps])
+
+    def test_presence(self):
+        pipeline = self._pipeline('--output', 'presence', '--enter-time', '0', '--heartbeat', '10')
+        pipeline.run()
+        pipeline.close()
+
+        # one enter event and the state, repeated only with the heartbeat, also without --delta
+        self.assertTrue(self.server.recv(1024).startswith(b'/face/enter'))
+        self.assertTrue(self.server.recv(1024).startswith(b'/face/present'))
+        self.server.settimeout(0.2)
+        self.assertRaises(socket.timeout, self.server.recv, 1024)
+
+    def test_presence_state_heartbeat(self):
+        pipeline = self._pipeline('--output', 'presence', '--enter-time', '0', '--heartbeat', '0.000001')
+        pipeline.run()
+        pipeline.close()
+
+        # a keepalive on every frame repeats the state but not the event
+        datagrams = [self.server.recv(1024) for _ in range(4)]
+        self.assertEqual([d.split(b'\0')[0] for d in datagrams],
+                         [b'/face/enter', b'/face/present', b'/face/present', b'/face/present'])
+
+    def test_foreground_rejects_roi_padding(self):
+        # padded crops would reach the background model
+        self.assertRaises(SystemExit, parse_args, ['--foreground', '--roi-padding', '0.5'])
+        self.assertTrue(parse_args(['--foreground']).foreground)
+
+    def test_tiles_reject_conflicting_options(self):
+        for options in (['--detector', 'dnn'], ['--detect-scale', '0.5'], ['--latency-budget', '30'],
+                        ['--workers', '2']):
+            self.assertRaises(SystemExit, parse_args, ['--tiles'] + options)
+
+        self.assertTrue(parse_args(['--tiles', '--detector', 'lbp']).tiles)
+
+    def test_workers_reject_conflicting_options(self):
+        for options in (['--detect-interval', '5'], ['--roi-padding', '0.5'], ['--motion-gate', '0.002'],
+                        ['--foreground'], ['--latency-budget', '30']):
+            self.assertRaises(SystemExit, parse_args, ['--workers', '2'] + options)
+
+        self.assertEqual(parse_args(['--workers', '2', '--detect-interval', '1']).workers, 2)
+
+    def test_luma_rejects_preview_and_dnn(self):
+        self.assertRaises(SystemExit, parse_args, ['--luma'])
+        self.assertRaises(SystemExit, parse_args, ['--luma', '--headless', '--detector', 'dnn'])
+        self.assertTrue(parse_args(['--luma', '--headless']).luma)
+
+    def test_luma_without_camera_falls_back(self):
+        pipeline = self._pipeline('--luma')
+        pipeline.run()
+        pipeline.close()
+
+        self.assertIsNone(pipeline.luma_size)
+        self.assertEqual(pipeline.frame_count, 3)
+
+    def test_several_sources_reject_workers(self):
+        self.assertRaises(SystemExit, parse_args, ['--source', '0', '1', '--workers', '2'])
+
+
+if __name__ == "__main__":
+    unittest.main()
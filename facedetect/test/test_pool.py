@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import unittest
+
+import numpy as np
+import cv2
+
+from facedetect import DetectorPool
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class TestDetectorPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DetectorPool(2, (120, 160), 'haar', _CASCADE, scale_factor=1.3, min_neighbors=5, slots=3)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_results_in_order(self):
+        gray = np.zeros((120, 160), dtype=np.uint8)
+        seqs = []
+
+        # more frames than slots, so slots have to be recycled
+        for _ in range(10):
+            self.pool.submit(gray)
+            seqs.extend(seq for seq, _ in self.pool.results())
+
+        while len(self.pool):
+            seqs.extend(seq for seq, _ in self.pool.results(block=True))
+
+        self.assertEqual(seqs, list(range(10)))
+
+    def test_boxes(self):
+        self.pool.submit(np.zeros((120, 160), dtype=np.uint8))
+
+        [(seq, (boxes, scores))] = self.pool.results(block=True)
+
+        self.assertEqual(seq, 0)
+        self.assertEqual(boxes.shape, (0, 4))
+        self.assertEqual(scores.shape, (0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
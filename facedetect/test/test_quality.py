@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from facedetect import QualityController, QualityLevel, DEFAULT_LEVELS
+
+
+class TestQualityController(unittest.TestCase):
+
+    def test_degrades_over_budget(self):
+        quality = QualityController(20, hold=5)
+
+        for _ in range(5):
+            quality.update(50)
+
+        self.assertEqual(quality.index, 1)
+
+        for _ in range(100):
+            quality.update(50)
+
+        self.assertEqual(quality.index, len(DEFAULT_LEVELS) - 1)
+
+    def test_recovers_under_budget(self):
+        quality = QualityController(20, hold=5)
+
+        for _ in range(20):
+            quality.update(50)
+
+        index = quality.index
+
+        for _ in range(200):
+            quality.update(2)
+
+        self.assertLess(quality.index, index)
+        self.assertEqual(quality.index, 0)
+
+    def test_holds_within_budget(self):
+        quality = QualityController(20, hold=5)
+
+        for _ in range(100):
+            quality.update(15)
+
+        self.assertEqual(quality.index, 0)
+
+    def test_apply(self):
+        levels = (QualityLevel(0.5, 3, 60, 1.4),)
+        detector = mock.Mock()
+        tracker = mock.Mock()
+
+        QualityController(20, levels=levels).apply(detector, tracker)
+
+        self.assertEqual(detector.detect_scale, 0.5)
+        self.assertEqual(detector.min_size, (60, 60))
+        self.assertEqual(detector.scale_factor, 1.4)
+        self.assertEqual(tracker.interval, 3)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, QualityController, 0)
+        self.assertRaises(ValueError, QualityController, 20, levels=())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import unittest
+
+import numpy as np
+
+from facedetect import OneEuroFilter
+
+
+class TestOneEuroFilter(unittest.TestCase):
+
+    def test_first_value_passes_through(self):
+        smooth = OneEuroFilter()
+
+        self.assertEqual(smooth([3], [(10, 20, 30, 40)], 0.0).tolist(), [[10, 20, 30, 40]])
+
+    def test_reduces_jitter(self):
+        smooth = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+        rng = np.random.RandomState(1)
+        raw = 100 + rng.uniform(-5, 5, (60, 4))
+        filtered = np.array([smooth([0], [box], i / 30.0)[0] for i, box in enumerate(raw)])
+
+        self.assertLess(np.std(np.diff(filtered[10:], axis=0)), np.std(np.diff(raw[10:], axis=0)) / 3)
+
+    def test_fast_motion_follows(self):
+        smooth = OneEuroFilter(min_cutoff=1.0, beta=0.05)
+
+        for i in range(30):
+            box = smooth([0], [(i * 20, 0, 50, 50)], i / 30.0)[0]
+
+        self.assertGreater(box[0], 29 * 20 - 40)
+
+    def test_faces_are_independent(self):
+        smooth = OneEuroFilter()
+        smooth([0, 1], [(0, 0, 50, 50), (200, 0, 50, 50)], 0.0)
+
+        result = smooth([1, 0], [(200, 0, 50, 50), (0, 0, 50, 50)], 0.1)
+
+        self.assertEqual(result.tolist(), [[200, 0, 50, 50], [0, 0, 50, 50]])
+
+    def test_state_expires(self):
+        smooth = OneEuroFilter(max_age=1.0)
+        smooth([0], [(0, 0, 50, 50)], 0.0)
+
+        self.assertEqual(smooth([0], [(100, 0, 50, 50)], 2.0).tolist(), [[100, 0, 50, 50]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+
+from facedetect import SnapshotWriter
+
+
+class TestSnapshotWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, '1.png')
+        self.img = np.full((48, 64, 3), 200, dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_write(self):
+        writer = SnapshotWriter(self.path, max_rate=0)
+        self.assertTrue(writer.submit(self.img))
+        writer.close()
+
+        self.assertEqual(writer.written, 1)
+        self.assertEqual(cv2.imread(self.path).tolist(), self.img.tolist())
+        self.assertEqual(os.listdir(self.dir), ['1.png'])
+
+    def test_rate_limit(self):
+        writer = SnapshotWriter(self.path, max_rate=1.0)
+
+        self.assertTrue(writer.submit(self.img))
+        self.assertFalse(writer.submit(self.img))
+        writer.close()
+
+        self.assertEqual(writer.written, 1)
+        self.assertEqual(writer.skipped, 1)
+
+    def test_due(self):
+        writer = SnapshotWriter(self.path, max_rate=2.0)
+
+        self.assertTrue(writer.due())
+        writer.submit(self.img)
+        writer.close()
+
+        self.assertFalse(writer.due())
+        self.assertTrue(writer.due(time.monotonic() + 0.5))
+
+    def test_faces_only(self):
+        writer = SnapshotWriter(self.path, max_rate=0, faces_only=True)
+
+        self.assertFalse(writer.submit(self.img, has_faces=False))
+        writer.close()
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_submit_copies_frame(self):
+        writer = SnapshotWriter(self.path, max_rate=0)
+        writer.submit(self.img)
+        self.img[:] = 0
+        writer.close()
+
+        self.assertEqual(cv2.imread(self.path).max(), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+
+from facedetect import CascadeDetector, ImageSequenceSource, SyntheticSource, open_source, is_camera
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class TestSyntheticSource(unittest.TestCase):
+
+    def test_deterministic(self):
+        a, b = SyntheticSource(frames=5, seed=3), SyntheticSource(frames=5, seed=3)
+
+        for _ in range(5):
+            self.assertTrue(np.array_equal(a.read()[1], b.read()[1]))
+
+        self.assertEqual(a.read(), (False, None))
+
+    def test_read_into_buffer(self):
+        source = SyntheticSource(width=160, height=120, frames=2)
+        image = np.empty((120, 160, 3), dtype=np.uint8)
+
+        ret, frame = source.read(image=image)
+        self.assertIs(frame, image)
+
+        ret, frame = source.read(image=np.empty((10, 10, 3), dtype=np.uint8))
+        self.assertEqual(frame.shape, (120, 160, 3))
+
+    def test_faces_are_detected(self):
+        source = SyntheticSource(frames=10, faces=2)
+        detector = CascadeDetector(_CASCADE)
+
+        for _ in range(10):
+            ret, frame = source.read()
+
+            self.assertEqual(frame.shape, (480, 640, 3))
+            self.assertEqual(len(detector.detect(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))[0]), 2)
+
+    def test_properties(self):
+        source = SyntheticSource(width=320, height=240, frames=7, fps=25)
+
+        self.assertEqual(source.get(cv2.CAP_PROP_FPS), 25)
+        self.assertEqual(source.get(cv2.CAP_PROP_FRAME_COUNT), 7)
+        self.assertEqual(source.get(cv2.CAP_PROP_FRAME_WIDTH), 320)
+
+
+class TestImageSequenceSource(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+        for i in (2, 0, 1):
+            cv2.imwrite(os.path.join(self.dir, 'frame%03d.png' % i), np.full((8, 8, 3), i * 10, dtype=np.uint8))
+
+        open(os.path.join(self.dir, 'notes.txt'), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_name_order(self):
+        source = ImageSequenceSource(self.dir)
+        values = []
+
+        while True:
+            ret, frame = source.read()
+
+            if not ret:
+                break
+
+            values.append(int(frame[0, 0, 0]))
+
+        self.assertEqual(values, [0, 10, 20])
+
+    def test_open_source(self):
+        self.assertIsInstance(open_source(self.dir), ImageSequenceSource)
+
+
+class TestOpenSource(unittest.TestCase):
+
+    def test_synthetic(self):
+        self.assertIsInstance(open_source('synthetic'), SyntheticSource)
+
+    def test_missing_file(self):
+        self.assertRaises(IOError, open_source, 'missing.avi')
+
+    def test_is_camera(self):
+        self.assertTrue(is_camera('0'))
+        self.assertTrue(is_camera(1))
+        self.assertFalse(is_camera('video.mp4'))
+
+
+if __name__ == "__main__":
+    unittest.main()
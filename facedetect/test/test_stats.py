@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import io
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+from facedetect import StageTimer, NullTimer
+
+
+class TestStageTimer(unittest.TestCase):
+
+    def _run(self, timer, frames=5):
+        for _ in range(frames):
+            timer.start()
+            time.sleep(0.002)
+            timer.mark("read")
+            timer.mark("detect")
+            timer.frame_done()
+
+    def test_percentiles(self):
+        timer = StageTimer(interval=60, window=3)
+        self._run(timer)
+
+        stages = timer.percentiles()
+
+        self.assertEqual(list(stages), ["read", "detect"])
+        self.assertGreaterEqual(stages["read"][0], 2.0)
+        self.assertLess(stages["detect"][2], 1.0)
+
+    def test_report_printed(self):
+        stream = io.StringIO()
+        timer = StageTimer(interval=0, stream=stream)
+        self._run(timer, 1)
+
+        output = stream.getvalue()
+
+        self.assertIn("fps", output)
+        self.assertIn("read", output)
+
+    def test_report_exported(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'stats.jsonl')
+
+        try:
+            timer = StageTimer(interval=0, path=path)
+            self._run(timer, 2)
+
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(sorted(records[0]['stages']['read']), ['p50', 'p95', 'p99'])
+
+    def test_null_timer(self):
+        timer = NullTimer()
+        timer.start()
+        timer.mark("read")
+        timer.frame_done()
+        timer.report()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy as np
+
+from facedetect import TemplateTracker, DetectThenTrack, CentroidTracker
+
+
+def _frame(x, y, size=80):
+    """Returns a noisy frame with a textured square at (x, y)"""
+
+    rng = np.random.RandomState(7)
+    frame = np.full((240, 320), 128, dtype=np.uint8)
+    frame[y:y + size, x:x + size] = rng.randint(0, 255, (size, size))
+
+    return frame
+
+
+class TestTemplateTracker(unittest.TestCase):
+
+    def test_follows_motion(self):
+        tracker = TemplateTracker()
+        tracker.init(_frame(100, 60), [(100, 60, 80, 80)])
+
+        boxes, scores = tracker.update(_frame(112, 52))
+
+        self.assertLessEqual(abs(boxes[0, 0] - 112), 3)
+        self.assertLessEqual(abs(boxes[0, 1] - 52), 3)
+        self.assertEqual(boxes[0, 2:].tolist(), [80, 80])
+        self.assertGreater(scores[0], 0.6)
+
+    def test_lost_face_scores_low(self):
+        tracker = TemplateTracker()
+        tracker.init(_frame(100, 60), [(100, 60, 80, 80)])
+
+        _, scores = tracker.update(np.full((240, 320), 128, dtype=np.uint8))
+
+        self.assertLess(scores[0], 0.6)
+
+    def test_no_faces(self):
+        tracker = TemplateTracker()
+        tracker.init(_frame(100, 60), [])
+
+        boxes, scores = tracker.update(_frame(100, 60))
+
+        self.assertEqual(boxes.shape, (0, 4))
+        self.assertEqual(len(scores), 0)
+
+
+class TestDetectThenTrack(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = mock.Mock()
+        self.detector.detect.return_value = (np.array([[100, 60, 80, 80]], dtype=np.int32),
+                                             np.array([0.9], dtype=np.float32))
+
+    def test_interval(self):
+        hybrid = DetectThenTrack(self.detector, interval=4)
+
+        for _ in range(8):
+            hybrid.detect(_frame(100, 60))
+
+        self.assertEqual(self.detector.detect.call_count, 2)
+
+    def test_interval_one_detects_every_frame(self):
+        hybrid = DetectThenTrack(self.detector, interval=1)
+
+        for _ in range(3):
+            hybrid.detect(_frame(100, 60))
+
+        self.assertEqual(self.detector.detect.call_count, 3)
+
+    def test_tracked_faces_keep_detection_score(self):
+        hybrid = DetectThenTrack(self.detector, interval=4)
+        hybrid.detect(_frame(100, 60))
+
+        boxes, scores = hybrid.detect(_frame(100, 60))
+
+        self.assertEqual(self.detector.detect.call_count, 1)
+        self.assertEqual(boxes.shape, (1, 4))
+        self.assertEqual(scores.shape, (1,))
+        self.assertAlmostEqual(float(scores[0]), 0.9, places=5)
+
+    def test_interval_change_detects(self):
+        hybrid = DetectThenTrack(self.detector, interval=1)
+        hybrid.detect(_frame(100, 60))
+
+        # the tracker was never initialized at interval 1
+        hybrid.interval = 3
+
+        for _ in range(3):
+            boxes, scores = hybrid.detect(_frame(100, 60))
+
+            self.assertEqual((len(boxes), len(scores)), (1, 1))
+            self.assertAlmostEqual(float(scores[0]), 0.9, places=5)
+
+        self.assertEqual(self.detector.detect.call_count, 2)
+
+    def test_redetect_on_low_confidence(self):
+        hybrid = DetectThenTrack(self.detector, interval=10)
+        hybrid.detect(_frame(100, 60))
+        hybrid.detect(np.full((240, 320), 128, dtype=np.uint8))
+
+        self.assertEqual(self.detector.detect.call_count, 2)
+
+
+class TestCentroidTracker(unittest.TestCase):
+
+    def test_stable_ids(self):
+        tracker = CentroidTracker()
+
+        self.assertEqual(tracker.update([(0, 0, 50, 50), (300, 0, 50, 50)]).tolist(), [0, 1])
+        # faces swapped order and moved a little
+        self.assertEqual(tracker.update([(310, 5, 50, 50), (10, 5, 50, 50)]).tolist(), [1, 0])
+
+    def test_new_face_gets_new_id(self):
+        tracker = CentroidTracker()
+        tracker.update([(0, 0, 50, 50)])
+
+        self.assertEqual(tracker.update([(0, 0, 50, 50), (300, 300, 50, 50)]).tolist(), [0, 1])
+
+    def test_jump_beyond_max_distance(self):
+        tracker = CentroidTracker(max_distance=1.0)
+        tracker.update([(0, 0, 50, 50)])
+
+        self.assertEqual(tracker.update([(200, 0, 50, 50)]).tolist(), [1])
+
+    def test_greedy_prefers_closest_pair(self):
+        tracker = CentroidTracker(max_distance=3.0)
+        tracker.update([(0, 0, 50, 50), (100, 0, 50, 50)])
+
+        self.assertEqual(tracker.update([(90, 0, 50, 50)]).tolist(), [1])
+
+    def test_missing_face_expires(self):
+        tracker = CentroidTracker(max_missing=2)
+        tracker.update([(0, 0, 50, 50)])
+
+        tracker.update([])
+        tracker.update([])
+        self.assertEqual(tracker.ids.tolist(), [0])
+        self.assertEqual(tracker.update([(0, 0, 50, 50)]).tolist(), [0])
+
+        for _ in range(3):
+            tracker.update([])
+
+        self.assertEqual(tracker.ids.tolist(), [])
+        self.assertEqual(tracker.update([(0, 0, 50, 50)]).tolist(), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
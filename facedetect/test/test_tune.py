@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+
+from facedetect import (SyntheticSource, TuneConfig, TuneResult, iou_matrix, match_boxes, load_frames,
+                        load_labels, config_grid, sweep, pareto_front)
+
+_CASCADE = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+
+
+class TestMatching(unittest.TestCase):
+
+    def test_iou_matrix(self):
+        iou = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 10, 10), (20, 20, 5, 5)])
+
+        np.testing.assert_allclose(iou, [[1.0, 50.0 / 150.0, 0.0]])
+
+    def test_match_boxes_one_to_one(self):
+        truth = [(0, 0, 10, 10)]
+
+        self.assertEqual(match_boxes([(0, 0, 10, 10), (1, 0, 10, 10)], truth), 1)
+        self.assertEqual(match_boxes([(5, 0, 10, 10)], truth), 0)
+        self.assertEqual(match_boxes([], truth), 0)
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_config_grid(self):
+        grid = config_grid([1.1, 1.3], [3], [0], [1.0, 0.5])
+
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(grid[0], TuneConfig(1.1, 3, 0, 1.0))
+
+    def test_pareto_front(self):
+        fast = TuneResult(None, 1.0, 0.5, 1.0)
+        slow_better = TuneResult(None, 5.0, 0.9, 1.0)
+        dominated = TuneResult(None, 6.0, 0.8, 1.0)
+
+        self.assertEqual(pareto_front([dominated, slow_better, fast]), [fast, slow_better])
+
+    def test_sweep(self):
+        frames = load_frames(SyntheticSource(frames=4), 0)
+        labels = [np.array([[0, 0, 1, 1]])] * 4
+        configs = config_grid([1.3], [5], [0], [1.0, 0.5])
+
+        serial = sweep(_CASCADE, frames, labels, configs, processes=1)
+        parallel = sweep(_CASCADE, frames, labels, configs, processes=2)
+
+        self.assertEqual([r.config for r in parallel], configs)
+        self.assertEqual([r.precision for r in serial], [r.precision for r in parallel])
+        self.assertEqual(serial[0].recall, 0.0)
+        self.assertEqual(serial[0].precision, 0.0)
+
+    def test_recall_against_reference(self):
+        frames = load_frames(SyntheticSource(frames=3), 0)
+        configs = config_grid([1.3], [5], [0], [1.0])
+        labels = [cv2.CascadeClassifier(_CASCADE).detectMultiScale(gray, 1.3, 5) for gray in frames]
+
+        [result] = sweep(_CASCADE, frames, labels, configs, processes=1)
+
+        self.assertEqual((result.recall, result.precision), (1.0, 1.0))
+
+
+class TestLoadLabels(unittest.TestCase):
+
+    def test_missing_frames_have_no_faces(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'labels.json')
+
+        try:
+            with open(path, 'w') as f:
+                json.dump({"1": [[10, 20, 30, 40]]}, f)
+
+            labels = load_labels(path, 3)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual([len(l) for l in labels], [0, 1, 0])
+        self.assertEqual(labels[1].tolist(), [[10, 20, 30, 40]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.tracking
+    ~~~~~~~~~~~~~~~~~~~
+
+    Face tracking between detections
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import numpy as np
+import cv2
+
+__all__ = [
+    'TemplateTracker',
+    'DetectThenTrack',
+    'CentroidTracker'
+    ]
+
+
+class TemplateTracker(object):
+    """Follow faces with normalized template matching in a window around the last box.
+
+    Matching runs on patches reduced so that a face is about track_size pixels
+    wide, which keeps the cost independent of the face size.
+    """
+
+    def __init__(self, search=0.5, track_size=32):
+        """Create a tracker without faces.
+
+        Args:
+            search (float): search window padding as a fraction of the face size
+            track_size (int): face width in pixels used for matching
+        """
+
+        self.search = search
+        self.track_size = track_size
+
+        self._boxes = np.empty((0, 4), dtype=np.int32)
+        self._templates = []
+        self._scales = []
+
+    @property
+    def boxes(self):
+        """Returns int32 array of the tracked (x, y, w, h) boxes"""
+
+        return self._boxes
+
+    def init(self, gray, boxes):
+        """Start tracking new boxes.
+
+        Args:
+            gray: 8-bit grayscale frame the boxes were detected on
+            boxes: array of (x, y, w, h) boxes
+        """
+
+        self._boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self._templates = []
+        self._scales = []
+
+        for (x, y, w, h) in self._boxes:
+            scale = min(1.0, float(self.track_size) / w)
+            patch = gray[y:y + h, x:x + w]
+
+            self._templates.append(cv2.resize(patch, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+            self._scales.append(scale)
+
+    def update(self, gray):
+        """Find the tracked faces on a new frame.
+
+        Args:
+            gray: 8-bit grayscale frame
+        Returns:
+            tuple (boxes, scores), scores are the match correlations in range [-1, 1]
+        """
+
+        rows, cols = gray.shape[:2]
+        scores = np.empty(len(self._boxes), dtype=np.float32)
+
+        for i, (x, y, w, h) in enumerate(self._boxes):
+            template = self._templates[i]
+            scale = self._scales[i]
+            pad_x = int(w * self.search)
+            pad_y = int(h * self.search)
+
+            x0, y0 = max(x - pad_x, 0), max(y - pad_y, 0)
+            x1, y1 = min(x + w + pad_x, cols), min(y + h + pad_y, rows)
+
+            window = cv2.resize(gray[y0:y1, x0:x1], None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            if window.shape[0] < template.shape[0] or window.shape[1] < template.shape[1]:
+                # face left the frame
+                scores[i] = -1.0
+
+                continue
+
+            result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(result)
+
+            self._boxes[i, 0] = x0 + int(round(location[0] / scale))
+            self._boxes[i, 1] = y0 + int(round(location[1] / scale))
+            scores[i] = score
+
+        return self._boxes.copy(), scores
+
+
+class DetectThenTrack(object):
+    """Run a detector every N frames and track the faces in between.
+
+    The detector also runs as soon as the weakest tracked face drops below
+    the confidence threshold.
+    """
+
+    def __init__(self, detector, interval=5, threshold=0.6, tracker=None):
+        """Combine a detector with a tracker.
+
+        Args:
+            detector: Detector instance
+            interval (int): run the detector on every interval-th frame, 1 disables tracking
+            threshold (float): tracking score below which the detector runs immediately
+            tracker: TemplateTracker instance, a default one is created if None
+        """
+
+        self.detector = detector
+        self.threshold = threshold
+        self.tracker = tracker or TemplateTracker()
+        self.interval = interval
+
+        self._scores = np.empty(0, dtype=np.float32)
+
+    @property
+    def color(self):
+        """Returns True if the wrapped detector wants BGR frames"""
+
+        return self.detector.color
+
+    @property
+    def interval(self):
+        """Returns number of frames between detections"""
+
+        return self._interval
+
+    @interval.setter
+    def interval(self, interval):
+        """Change the detection interval, the detector runs on the next frame.
+
+        The tracker is only initialized while the interval is above 1, so it
+        has to start from a fresh detection, which also gives the tracked
+        faces their score.
+        """
+
+        self._interval = interval
+        self._since_detect = interval
+
+    def detect(self, frame):
+        """Returns (boxes, scores) of the faces on the frame
+
+        Tracked faces keep the detector score of their last detection.
+
+        Args:
+            frame: frame the wrapped detector accepts
+        """
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 and self.interval > 1 else frame
+        self._since_detect += 1
+
+        if self._since_detect < self.interval:
+            boxes, scores = self.tracker.update(gray)
+
+            if len(scores) == 0 or scores.min() >= self.threshold:
+                return boxes, self._scores.copy()
+
+        boxes, self._scores = self.detector.detect(frame)
+        self._since_detect = 0
+
+        if self.interval > 1:
+            self.tracker.init(gray, boxes)
+
+        return boxes, self._scores.copy()
+
+
+class CentroidTracker(object):
+    """Give every face a stable id by matching box centers from frame to frame.
+
+    Detections are matched to the known faces greedily, closest pair first,
+    using a distance matrix computed in one NumPy operation. Distances are
+    measured in face widths so the gate works for near and far faces alike.
+    """
+
+    def __init__(self, max_distance=1.0, max_missing=10):
+        """Create a tracker without faces.
+
+        Args:
+            max_distance (float): largest center movement between frames, in face widths
+            max_missing (int): frames a face may be missing before its id is dropped
+        """
+
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+
+        self._ids = np.empty(0, dtype=np.int32)
+        self._boxes = np.empty((0, 4), dtype=np.int32)
+        self._missing = np.empty(0, dtype=np.int32)
+        self._next_id = 0
+
+    @property
+    def ids(self):
+        """Returns ids of all faces which are still tracked, including missing ones"""
+
+        return self._ids
+
+    def update(self, boxes):
+        """Match the boxes of a new frame to the tracked faces.
+
+        Args:
+            boxes: array of (x, y, w, h) boxes
+        Returns:
+            int32 array with the id of every box, in the order of boxes
+        """
+
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        ids = np.full(len(boxes), -1, dtype=np.int32)
+        matched = np.zeros(len(self._ids), dtype=bool)
+
+        if len(self._ids) and len(boxes):
+            known = self._boxes[:, :2] + self._boxes[:, 2:] / 2.0
+            found = boxes[:, :2] + boxes[:, 2:] / 2.0
+            distance = np.linalg.norm(known[:, None, :] - found[None, :, :], axis=2) / self._boxes[:, 2:3]
+
+            rows, cols = np.unravel_index(np.argsort(distance, axis=None), distance.shape)
+            used = np.zeros(len(boxes), dtype=bool)
+
+            for row, col in zip(rows, cols):
+                if distance[row, col] > self.max_distance:
+                    break
+
+                if matched[row] or used[col]:
+                    continue
+
+                matched[row] = used[col] = True
+                ids[col] = self._ids[row]
+                self._boxes[row] = boxes[col]
+
+        self._missing[matched] = 0
+        self._missing[~matched] += 1
+
+        keep = self._missing <= self.max_missing
+        new = ids < 0
+        count = int(new.sum())
+
+        ids[new] = np.arange(self._next_id, self._next_id + count, dtype=np.int32)
+        self._next_id += count
+
+        self._ids = np.concatenate((self._ids[keep], ids[new]))
+        self._boxes = np.vstack((self._boxes[keep], boxes[new]))
+        self._missing = np.concatenate((self._missing[keep], np.zeros(count, dtype=np.int32)))
+
+        return ids
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+    facedetect.tune
+    ~~~~~~~~~~~~~~~
+
+    Sweep of cascade parameters over recorded frames
+
+    :license: MIT, see LICENSE for more details.
+"""
+
+import time
+import json
+import itertools
+import collections
+import multiprocessing
+
+import numpy as np
+import cv2
+
+from .detect import CascadeDetector, iou_matrix
+
+__all__ = [
+    'TuneConfig',
+    'TuneResult',
+    'match_boxes',
+    'load_frames',
+    'load_labels',
+    'config_grid',
+    'sweep',
+    'pareto_front'
+    ]
+
+
+TuneConfig = collections.namedtuple('TuneConfig', ['scale_factor', 'min_neighbors', 'min_size', 'detect_scale'])
+TuneResult = collections.namedtuple('TuneResult', ['config', 'ms_per_frame', 'recall', 'precision'])
+
+
+def match_boxes(found, truth, threshold=0.5):
+    """Count detections matching the ground truth, each box is matched at most once.
+
+    Args:
+        found: detected (x, y, w, h) boxes
+        truth: ground truth (x, y, w, h) boxes
+        threshold (float): smallest intersection over union of a match
+    Returns:
+        number of matched pairs
+    """
+
+    if len(found) == 0 or len(truth) == 0:
+        return 0
+
+    iou = iou_matrix(found, truth)
+    matches = 0
+
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+
+        if iou[i, j] < threshold:
+            return matches
+
+        matches += 1
+        iou[i, :] = -1
+        iou[:, j] = -1
+
+
+def load_frames(source, limit=0):
+    """Read grayscale frames from a source.
+
+    Args:
+        source: object with the cv2.VideoCapture read() method
+        limit (int): maximum number of frames, 0 reads all
+    Returns:
+        list of 8-bit grayscale frames
+    """
+
+    frames = []
+
+    while not limit or len(frames) < limit:
+        ret, frame = source.read()
+
+        if not ret:
+            break
+
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        frames.append(frame)
+
+    return frames
+
+
+def load_labels(path, count):
+    """Load ground truth boxes from a JSON file.
+
+    The file maps frame indexes to lists of [x, y, w, h] boxes, frames which
+    are missing have no faces: {"0": [[10, 20, 80, 80]], "5": []}
+
+    Args:
+        path (str): JSON file
+        count (int): number of frames
+    Returns:
+        list with an array of boxes for every frame
+    """
+
+    with open(path) as f:
+        data = json.load(f)
+
+    return [np.asarray(data.get(str(i), []), dtype=np.int32).reshape(-1, 4) for i in range(count)]
+
+
+def config_grid(scale_factors, min_neighbors, min_sizes, detect_scales):
+    """Returns list of TuneConfig for every combination of the values"""
+
+    return [TuneConfig(*values) for values in itertools.product(scale_factors, min_neighbors, min_sizes, detect_scales)]
+
+
+# frames and labels of a sweep worker, set once per process by _init_worker
+_worker_state = {}
+
+
+def _init_worker(cascade, frames, labels):
+    """Keep the frames in the worker so they are not sent with every config"""
+
+    _worker_state['cascade'] = cascade
+    _worker_state['frames'] = frames
+    _worker_state['labels'] = labels
+
+
+def _evaluate(config):
+    """Run one config over all frames, returns TuneResult"""
+
+    min_size = (config.min_size, config.min_size) if config.min_size else None
+    detector = CascadeDetector(_worker_state['cascade'], config.scale_factor, config.min_neighbors,
+                               min_size=min_size, detect_scale=config.detect_scale)
+    found_total = truth_total = matched = 0
+    elapsed = 0
+
+    for gray, truth in zip(_worker_state['frames'], _worker_state['labels']):
+        start = time.perf_counter_ns()
+        found, _ = detector.detect(gray)
+        elapsed += time.perf_counter_ns() - start
+
+        matched += match_boxes(found, truth)
+        found_total += len(found)
+        truth_total += len(truth)
+
+    recall = float(matched) / truth_total if truth_total else 1.0
+    precision = float(matched) / found_total if found_total else 1.0
+
+    return TuneResult(config, elapsed / 1e6 / max(len(_worker_state['frames']), 1), recall, precision)
+
+
+def sweep(cascade, frames, labels, configs, processes=None):
+    """Evaluate every config in parallel worker processes.
+
+    Args:
+        cascade (str): path to the cascade xml file
+        frames: list of grayscale frames
+        labels: list with an array of ground truth boxes for every frame
+        configs: list of TuneConfig
+        processes (int): number of worker processes, the number of CPUs if None
+    Returns:
+        list of TuneResult in the order of configs
+    """
+
+    if processes == 1:
+        _init_worker(cascade, frames, labels)
+
+        return [_evaluate(config) for config in configs]
+
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(cascade, frames, labels))
+
+    try:
+        return pool.map(_evaluate, configs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def pareto_front(results):
+    """Returns the results no other result beats in both speed and recall, fastest first"""
+
+    front = []
+
+    for result in sorted(results, key=lambda r: (r.ms_per_frame, -r.recall)):
+        if not front or result.recall > front[-1].recall:
+            front.append(result)
+
+    return front